@@ -105,14 +105,13 @@ def view_all_schedules():
     loading.stop()
     
     # Display schedules
-    all_schedules = schedule_list.display()
-    if not all_schedules:
+    if not schedule_list:
         print(Fore.YELLOW + "⚠️  Tidak ada jadwal yang tersedia.")
         print(Fore.WHITE + "💡 Gunakan menu 'Tambah Jadwal' untuk menambah jadwal baru.")
     else:
         # Convert to list of lists for tabulate
         table_data = []
-        for schedule in all_schedules:
+        for schedule in schedule_list:
             table_data.append([
                 Fore.CYAN + schedule['id'] + Style.RESET_ALL,
                 Fore.GREEN + schedule['dokter'] + Style.RESET_ALL, 
@@ -130,7 +129,7 @@ def view_all_schedules():
         ]
         print(tabulate(table_data, headers=headers, tablefmt="fancy_grid"))
         
-        print(Fore.CYAN + f"\n📊 Total Jadwal: {Fore.YELLOW}{len(all_schedules)} jadwal")
+        print(Fore.CYAN + f"\n📊 Total Jadwal: {Fore.YELLOW}{len(schedule_list)} jadwal")
     
     input(Fore.GREEN + "\n⏎ Tekan Enter untuk kembali ke menu...")
 
@@ -158,6 +157,7 @@ def add_doctor_schedule():
     
     print(Fore.CYAN + "└─────┴─────────────────────────────────────────┘")
     
+    loading = None
     try:
         doctor_choice = input(Fore.GREEN + "\n👨‍⚕️ Pilih dokter (nomor): " + Fore.WHITE)
         doctor_index = int(doctor_choice) - 1
@@ -210,29 +210,39 @@ def add_doctor_schedule():
             utils.show_error("Kuota harus lebih dari 0.")
             return
         
+        # Validate time format
+        try:
+            start_hour, start_min = map(int, start_time.split(':'))
+            end_hour, end_min = map(int, end_time.split(':'))
+            
+            if not (0 <= start_hour <= 23 and 0 <= start_min <= 59):
+                raise ValueError
+            if not (0 <= end_hour <= 23 and 0 <= end_min <= 59):
+                raise ValueError
+            if start_hour * 60 + start_min >= end_hour * 60 + end_min:
+                utils.show_error("Jam mulai harus lebih awal dari jam selesai.")
+                return
+                
+        except ValueError:
+            utils.show_error("Format waktu tidak valid. Gunakan format HH:MM (contoh: 08:30)")
+            return
+        
         # Check for time conflicts
         loading = utils.EnhancedLoadingAnimation("Memeriksa konflik jadwal", "dots")
         loading.start()
         
-        schedules = dm.read_csv("data/jadwal_dokter.csv")
-        for schedule in schedules:
-            if (schedule['dokter_id'] == doctor_id and 
-                schedule['hari'] == selected_day):
-                # Simple time overlap check
-                existing_start = schedule['jam_mulai']
-                existing_end = schedule['jam_selesai']
-                
-                if ((start_time >= existing_start and start_time < existing_end) or
-                    (end_time > existing_start and end_time <= existing_end) or
-                    (start_time <= existing_start and end_time >= existing_end)):
-                    loading.stop()
-                    utils.show_error(f"Jadwal bertabrakan dengan jadwal existing: {selected_day} {existing_start}-{existing_end}")
-                    return
+        conflicts = dm.schedule_conflicts(doctor_id, selected_day, start_time, end_time)
+        if conflicts:
+            existing_start = conflicts[0]['jam_mulai']
+            existing_end = conflicts[0]['jam_selesai']
+            loading.stop()
+            utils.show_error(f"Jadwal bertabrakan dengan jadwal existing: {selected_day} {existing_start}-{existing_end}")
+            return
         
         loading.stop()
         
         # Generate new schedule ID
-        new_id = f"J{len(schedules) + 1:03d}"
+        new_id = dm.next_id("data/jadwal_dokter.csv", "J")
         
         # Confirmation
         print(Fore.YELLOW + "\n📋 Konfirmasi Jadwal Baru:")
@@ -264,16 +274,30 @@ def add_doctor_schedule():
             'kuota': quota
         }
         
-        schedules.append(new_schedule)
-        dm.write_csv("data/jadwal_dokter.csv", schedules)
+        # Another session may have added a schedule while we waited for the
+        # confirmation: check again and only insert if the table is unchanged
+        # since that check
+        while True:
+            version = dm.table_version("data/jadwal_dokter.csv")
+            conflicts = dm.schedule_conflicts(doctor_id, selected_day, start_time, end_time)
+            if conflicts:
+                loading.stop()
+                utils.show_error(f"Jadwal bertabrakan dengan jadwal existing: {selected_day} {conflicts[0]['jam_mulai']}-{conflicts[0]['jam_selesai']}")
+                return
+            if dm.append_csv("data/jadwal_dokter.csv", new_schedule, expected_version=version):
+                break
         
         loading.stop()
         
         utils.show_success(f"Jadwal berhasil ditambahkan dengan ID {new_id}")
         
     except ValueError:
+        if loading:
+            loading.stop()
         utils.show_error("Input tidak valid. Pastikan menggunakan angka yang benar.")
     except Exception as e:
+        if loading:
+            loading.stop()
         utils.show_error(f"Terjadi kesalahan: {str(e)}")
 
 # Continue with remaining admin functions...
@@ -298,12 +322,10 @@ def edit_doctor_schedule():
     
     schedules = dm.read_csv("data/jadwal_dokter.csv")
     found_schedule = None
-    schedule_index = -1
     
-    for i, schedule in enumerate(schedules):
+    for schedule in schedules:
         if schedule['id'] == schedule_id:
             found_schedule = schedule
-            schedule_index = i
             break
     
     loading.stop()
@@ -369,6 +391,13 @@ def edit_doctor_schedule():
             utils.show_error("Kuota harus berupa angka positif.")
             return
         
+        # Check for overlapping schedules, other than the one being edited
+        conflicts = dm.schedule_conflicts(found_schedule['dokter_id'], selected_day, start_time, end_time,
+                                          exclude_id=found_schedule['id'])
+        if conflicts:
+            utils.show_error(f"Jadwal bertabrakan dengan jadwal existing: {selected_day} {conflicts[0]['jam_mulai']}-{conflicts[0]['jam_selesai']}")
+            return
+        
         # Confirmation
         print(Fore.YELLOW + "\n📋 Konfirmasi Perubahan:")
         print(Fore.CYAN + "┌─" + "─" * 50 + "┐")
@@ -389,13 +418,19 @@ def edit_doctor_schedule():
         loading = utils.EnhancedLoadingAnimation("Menyimpan perubahan", "bars")
         loading.start()
         
-        # Update schedule
-        schedules[schedule_index]['hari'] = selected_day
-        schedules[schedule_index]['jam_mulai'] = start_time
-        schedules[schedule_index]['jam_selesai'] = end_time
-        schedules[schedule_index]['kuota'] = quota
-        
-        dm.write_csv("data/jadwal_dokter.csv", schedules)
+        # Update schedule; if another session changed the schedules since the
+        # conflict check, check again on the fresh data before retrying
+        changes = {'hari': selected_day, 'jam_mulai': start_time, 'jam_selesai': end_time, 'kuota': quota}
+        while True:
+            version = dm.table_version("data/jadwal_dokter.csv")
+            conflicts = dm.schedule_conflicts(found_schedule['dokter_id'], selected_day, start_time, end_time,
+                                              exclude_id=found_schedule['id'])
+            if conflicts:
+                loading.stop()
+                utils.show_error(f"Jadwal bertabrakan dengan jadwal existing: {selected_day} {conflicts[0]['jam_mulai']}-{conflicts[0]['jam_selesai']}")
+                return
+            if dm.update_row("data/jadwal_dokter.csv", found_schedule['id'], changes, expected_version=version):
+                break
         loading.stop()
         
         utils.show_success("Jadwal berhasil diperbarui.")
@@ -431,7 +466,6 @@ def delete_doctor_schedule():
     loading.start()
     
     schedules = dm.read_csv("data/jadwal_dokter.csv")
-    registrations = dm.read_csv("data/pendaftaran.csv")
     
     # Find the schedule
     target_schedule = None
@@ -454,8 +488,7 @@ def delete_doctor_schedule():
             break
     
     # Check for active registrations
-    active_registrations = [reg for reg in registrations 
-                           if reg['jadwal_id'] == schedule_id and reg['status'] != 'Dibatalkan']
+    active_registrations = dm.active_registrations(schedule_id)
     
     loading.stop()
     
@@ -475,9 +508,8 @@ def delete_doctor_schedule():
         print(Fore.WHITE + "💡 Batalkan semua pendaftaran terlebih dahulu atau tunggu hingga selesai.")
         
         print(Fore.CYAN + "\n📋 Pendaftaran aktif:")
-        for i, reg in enumerate(active_registrations[:5], 1):  # Show max 5
-            patient_name = dm.get_patient_name(reg['pasien_id'])
-            print(Fore.WHITE + f"   {i}. {patient_name} - {reg['tanggal']} (Antrian {reg['nomor_antrian']})")
+        for i, reg in enumerate(dm.join_registrations(active_registrations[:5]), 1):  # Show max 5
+            print(Fore.WHITE + f"   {i}. {reg['nama_pasien']} - {reg['tanggal']} (Antrian {reg['nomor_antrian']})")
         
         if len(active_registrations) > 5:
             print(Fore.WHITE + f"   ... dan {len(active_registrations) - 5} pendaftaran lainnya")
@@ -506,9 +538,16 @@ def delete_doctor_schedule():
     loading = utils.EnhancedLoadingAnimation("Menghapus jadwal", "bars")
     loading.start()
     
-    # Remove schedule
-    updated_schedules = [sch for sch in schedules if sch['id'] != schedule_id]
-    dm.write_csv("data/jadwal_dokter.csv", updated_schedules)
+    # Remove schedule, unless a patient registered for it while we waited
+    # for the confirmation; retry if another session changed the schedules
+    while True:
+        version = dm.table_version("data/jadwal_dokter.csv")
+        if dm.active_registrations(schedule_id):
+            loading.stop()
+            utils.show_error("Jadwal tidak dapat dihapus karena sudah ada pendaftaran aktif.")
+            return
+        if dm.delete_row("data/jadwal_dokter.csv", schedule_id, expected_version=version):
+            break
     
     loading.stop()
     
@@ -524,25 +563,23 @@ def view_patient_data():
     loading = utils.EnhancedLoadingAnimation("Memuat data pasien", "dots")
     loading.start()
     
-    patients = dm.read_csv("data/pasien.csv")
+    # Build the display rows while streaming, without keeping the patient records
+    table_data = []
+    for i, patient in enumerate(dm.iter_csv("data/pasien.csv"), 1):
+        table_data.append([
+            Fore.CYAN + str(i) + Style.RESET_ALL,
+            Fore.GREEN + patient['id'] + Style.RESET_ALL,
+            Fore.YELLOW + patient['nama'] + Style.RESET_ALL,
+            Fore.WHITE + patient['username'] + Style.RESET_ALL,
+            Fore.MAGENTA + patient['kontak'] + Style.RESET_ALL
+        ])
     
     loading.stop()
     
-    if not patients:
+    if not table_data:
         print(Fore.YELLOW + "⚠️  Tidak ada data pasien terdaftar.")
         print(Fore.WHITE + "💡 Pasien dapat mendaftar melalui menu 'Registrasi' di halaman utama.")
     else:
-        # Convert to list of lists for tabulate
-        table_data = []
-        for i, patient in enumerate(patients, 1):
-            table_data.append([
-                Fore.CYAN + str(i) + Style.RESET_ALL,
-                Fore.GREEN + patient['id'] + Style.RESET_ALL,
-                Fore.YELLOW + patient['nama'] + Style.RESET_ALL,
-                Fore.WHITE + patient['username'] + Style.RESET_ALL,
-                Fore.MAGENTA + patient['kontak'] + Style.RESET_ALL
-            ])
-        
         headers = [
             Fore.BLUE + Style.BRIGHT + "No." + Style.RESET_ALL,
             Fore.BLUE + Style.BRIGHT + "ID Pasien" + Style.RESET_ALL,
@@ -552,7 +589,7 @@ def view_patient_data():
         ]
         print(tabulate(table_data, headers=headers, tablefmt="fancy_grid"))
         
-        print(Fore.CYAN + f"\n📊 Total Pasien Terdaftar: {Fore.YELLOW}{len(patients)} pasien")
+        print(Fore.CYAN + f"\n📊 Total Pasien Terdaftar: {Fore.YELLOW}{len(table_data)} pasien")
     
     input(Fore.GREEN + "\n⏎ Tekan Enter untuk kembali ke menu...")
 
@@ -563,10 +600,15 @@ def view_all_registrations():
     
     utils.print_data_table_header("📝 DATA PENDAFTARAN KONSULTASI 📝")
     
+    # Older finished registrations may have been moved to the archive
+    include_archive = False
+    if dm.has_archive("data/pendaftaran.csv"):
+        include_archive = input(Fore.GREEN + "📦 Sertakan data lama dari arsip? (y/n): " + Fore.WHITE).lower() == 'y'
+    
     loading = utils.EnhancedLoadingAnimation("Memuat data pendaftaran", "dots")
     loading.start()
     
-    registrations = dm.read_csv("data/pendaftaran.csv")
+    registrations = dm.load_registration_table("data/pendaftaran.csv", include_archive=include_archive)
     
     loading.stop()
     
@@ -576,8 +618,8 @@ def view_all_registrations():
     else:
         # Enhanced statistics
         total_reg = len(registrations)
-        active_reg = len([r for r in registrations if r['status'] != 'Dibatalkan'])
-        canceled_reg = len([r for r in registrations if r['status'] == 'Dibatalkan'])
+        canceled_reg = registrations.count(status='Dibatalkan')
+        active_reg = total_reg - canceled_reg
         
         print(Fore.CYAN + "📊 Statistik Pendaftaran:")
         print(Fore.WHITE + f"   • Total: {Fore.YELLOW}{total_reg}")
@@ -585,11 +627,11 @@ def view_all_registrations():
         print(Fore.WHITE + f"   • Dibatalkan: {Fore.RED}{canceled_reg}")
         print()
         
-        # Convert to list of lists for tabulate
+        # Convert to list of lists for tabulate (names resolved in one join pass)
         table_data = []
-        for i, reg in enumerate(registrations, 1):
-            patient_name = dm.get_patient_name(reg['pasien_id'])
-            schedule_details = dm.get_schedule_details(reg['jadwal_id'])
+        for i, reg in enumerate(dm.join_registrations(registrations), 1):
+            patient_name = reg['nama_pasien']
+            schedule_details = reg['detail_jadwal']
             
             # Enhanced status display
             status = reg['status']
@@ -635,65 +677,37 @@ def view_clinic_statistics():
     
     schedules = dm.read_csv("data/jadwal_dokter.csv")
     doctors = dm.read_csv("data/dokter.csv")
-    patients = dm.read_csv("data/pasien.csv")
-    registrations = dm.read_csv("data/pendaftaran.csv")
-    
-    # Calculate statistics
-    active_registrations = [reg for reg in registrations if reg['status'] != 'Dibatalkan']
-    canceled_registrations = [reg for reg in registrations if reg['status'] == 'Dibatalkan']
-    
-    # Count registrations by day
+    total_patients = sum(1 for _ in dm.iter_csv("data/pasien.csv"))
+    
+    schedules_by_id = {}
+    for sch in schedules:
+        schedules_by_id.setdefault(sch['id'], sch)
+    doctors_by_id = {}
+    for doc in doctors:
+        doctors_by_id.setdefault(doc['id'], doc)
+    
+    # Only the jadwal_id and status columns are scanned; the counts per
+    # schedule are then rolled up by day, doctor and specialty
+    reg_by_schedule = dm.count_by("data/pendaftaran.csv", 'jadwal_id', exclude={'status': 'Dibatalkan'})
+    active_registrations = sum(reg_by_schedule.values())
+    canceled_registrations = dm.count_rows("data/pendaftaran.csv", status='Dibatalkan')
     reg_by_day = {}
-    for reg in active_registrations:
-        schedule_id = reg['jadwal_id']
-        day = None
-        for sch in schedules:
-            if sch['id'] == schedule_id:
-                day = sch['hari']
-                break
-        
-        if day:
-            reg_by_day[day] = reg_by_day.get(day, 0) + 1
-    
-    # Count registrations by doctor
     reg_by_doctor = {}
-    for reg in active_registrations:
-        schedule_id = reg['jadwal_id']
-        doctor_id = None
-        for sch in schedules:
-            if sch['id'] == schedule_id:
-                doctor_id = sch['dokter_id']
-                break
-        
-        if doctor_id:
-            doctor_name = None
-            for doc in doctors:
-                if doc['id'] == doctor_id:
-                    doctor_name = doc['nama']
-                    break
-            
-            if doctor_name:
-                reg_by_doctor[doctor_name] = reg_by_doctor.get(doctor_name, 0) + 1
-    
-    # Count by specialty
     reg_by_specialty = {}
-    for reg in active_registrations:
-        schedule_id = reg['jadwal_id']
-        doctor_id = None
-        for sch in schedules:
-            if sch['id'] == schedule_id:
-                doctor_id = sch['dokter_id']
-                break
-        
-        if doctor_id:
-            specialty = None
-            for doc in doctors:
-                if doc['id'] == doctor_id:
-                    specialty = doc['spesialisasi']
-                    break
-            
-            if specialty:
-                reg_by_specialty[specialty] = reg_by_specialty.get(specialty, 0) + 1
+    for schedule_id, count in reg_by_schedule.items():
+        sch = schedules_by_id.get(schedule_id)
+        if not sch:
+            continue
+        if sch['hari']:
+            reg_by_day[sch['hari']] = reg_by_day.get(sch['hari'], 0) + count
+        
+        doc = doctors_by_id.get(sch['dokter_id'])
+        if not doc:
+            continue
+        if doc['nama']:
+            reg_by_doctor[doc['nama']] = reg_by_doctor.get(doc['nama'], 0) + count
+        if doc['spesialisasi']:
+            reg_by_specialty[doc['spesialisasi']] = reg_by_specialty.get(doc['spesialisasi'], 0) + count
     
     loading.stop()
     
@@ -703,10 +717,10 @@ def view_clinic_statistics():
     print(Fore.CYAN + "╠" + "═" * 60 + "╣")
     print(Fore.CYAN + "║" + " " * 60 + "║")
     print(Fore.CYAN + "║ " + Fore.GREEN + f"👩‍⚕️ Total Dokter:" + f"{len(doctors):>38}" + Fore.CYAN + " ║")
-    print(Fore.CYAN + "║ " + Fore.GREEN + f"👥 Total Pasien:" + f"{len(patients):>38}" + Fore.CYAN + " ║")
+    print(Fore.CYAN + "║ " + Fore.GREEN + f"👥 Total Pasien:" + f"{total_patients:>38}" + Fore.CYAN + " ║")
     print(Fore.CYAN + "║ " + Fore.GREEN + f"📅 Total Jadwal:" + f"{len(schedules):>38}" + Fore.CYAN + " ║")
-    print(Fore.CYAN + "║ " + Fore.GREEN + f"📝 Pendaftaran Aktif:" + f"{len(active_registrations):>31}" + Fore.CYAN + " ║")
-    print(Fore.CYAN + "║ " + Fore.RED + f"❌ Pendaftaran Dibatalkan:" + f"{len(canceled_registrations):>27}" + Fore.CYAN + " ║")
+    print(Fore.CYAN + "║ " + Fore.GREEN + f"📝 Pendaftaran Aktif:" + f"{active_registrations:>31}" + Fore.CYAN + " ║")
+    print(Fore.CYAN + "║ " + Fore.RED + f"❌ Pendaftaran Dibatalkan:" + f"{canceled_registrations:>27}" + Fore.CYAN + " ║")
     print(Fore.CYAN + "║" + " " * 60 + "║")
     print(Fore.CYAN + "╚" + "═" * 60 + "╝")
     
@@ -715,7 +729,7 @@ def view_clinic_statistics():
         utils.print_section_header("📅 PENDAFTARAN PER HARI", "📊")
         table_data = []
         for day, count in sorted(reg_by_day.items(), key=lambda x: x[1], reverse=True):
-            percentage = (count / len(active_registrations)) * 100 if active_registrations else 0
+            percentage = (count / active_registrations) * 100 if active_registrations else 0
             bar = "█" * min(int(percentage / 5), 20)  # Visual bar
             table_data.append([
                 Fore.YELLOW + day,
@@ -732,7 +746,7 @@ def view_clinic_statistics():
         utils.print_section_header("👩‍⚕️ PENDAFTARAN PER DOKTER", "📊")
         table_data = []
         for doctor, count in sorted(reg_by_doctor.items(), key=lambda x: x[1], reverse=True):
-            percentage = (count / len(active_registrations)) * 100 if active_registrations else 0
+            percentage = (count / active_registrations) * 100 if active_registrations else 0
             bar = "█" * min(int(percentage / 5), 20)
             table_data.append([
                 Fore.GREEN + doctor,
@@ -749,7 +763,7 @@ def view_clinic_statistics():
         utils.print_section_header("🏥 PENDAFTARAN PER SPESIALISASI", "📊")
         table_data = []
         for specialty, count in sorted(reg_by_specialty.items(), key=lambda x: x[1], reverse=True):
-            percentage = (count / len(active_registrations)) * 100 if active_registrations else 0
+            percentage = (count / active_registrations) * 100 if active_registrations else 0
             bar = "█" * min(int(percentage / 5), 20)
             table_data.append([
                 Fore.MAGENTA + specialty,
@@ -0,0 +1,71 @@
+# modules/archive.py - Compressed cold storage for finished table rows
+import csv
+import gzip
+import io
+import lzma
+import os
+import tempfile
+import time
+
+# Archived rows of "data/pendaftaran.csv" live in "data/pendaftaran_arsip/".
+# Every archive run writes one new compressed CSV file there atomically, so
+# existing archive files are never rewritten and a crash can at worst leave
+# a temp file behind. Readers stream all archive files in name (= time) order.
+_OPENERS = {".gz": gzip.open, ".xz": lzma.open}
+
+def archive_dir(filename):
+    """Return the directory holding the archive files of a table."""
+    return os.path.splitext(filename)[0] + "_arsip"
+
+def archive_files(filename):
+    """Return the archive files of a table, oldest first."""
+    directory = archive_dir(filename)
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, name) for name in sorted(names)
+            if name.endswith(".csv.gz") or name.endswith(".csv.xz")]
+
+def iter_rows(filename):
+    """Yield archived rows of a table one at a time, decompressing as it goes."""
+    for path in archive_files(filename):
+        opener = _OPENERS[os.path.splitext(path)[1]]
+        with opener(path, 'rt', newline='', encoding='utf-8') as file:
+            yield from csv.DictReader(file)
+
+def archived_ids(filename):
+    """Return the ids of every archived row of a table."""
+    return {row.get('id') for row in iter_rows(filename)}
+
+def write_batch(filename, fieldnames, rows, compression="gzip"):
+    """Write rows to a new archive file and return its path."""
+    directory = archive_dir(filename)
+    os.makedirs(directory, exist_ok=True)
+    extension = ".csv.xz" if compression == "lzma" else ".csv.gz"
+    opener = lzma.open if compression == "lzma" else gzip.open
+    
+    fd, temp_path = tempfile.mkstemp(prefix=".arsip-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            with opener(raw, 'wb') as compressed:
+                with io.TextIOWrapper(compressed, encoding='utf-8', newline='') as file:
+                    writer = csv.DictWriter(file, fieldnames=fieldnames, restval='', extrasaction='ignore')
+                    writer.writeheader()
+                    writer.writerows(rows)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.chmod(temp_path, 0o644)
+        
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(directory, stamp + extension)
+        counter = 1
+        while os.path.exists(path):
+            counter += 1
+            path = os.path.join(directory, f"{stamp}-{counter}{extension}")
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path
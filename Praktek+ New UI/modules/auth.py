@@ -3,7 +3,7 @@ import csv
 import os
 from colorama import Fore, Style
 from .data_structures.linked_list import LinkedList
-from .data_manager import read_csv, write_csv
+from .data_manager import find_accounts, append_csv, table_version, next_id
 from .utils import clear_screen, show_error, show_success, print_banner, get_input_with_prompt, EnhancedLoadingAnimation
 
 def authenticate_user():
@@ -31,35 +31,17 @@ def authenticate_user():
     loading = EnhancedLoadingAnimation("Memverifikasi kredensial", "dots")
     loading.start()
     
-    # Check admin credentials
-    admin_data = read_csv("data/admin.csv")
-    for admin in admin_data:
-        if admin['username'] == username and admin['password'] == password:
+    # Check credentials of admins, then doctors, then patients with this username
+    for role, account in find_accounts(username):
+        if account['password'] == password:
             loading.stop()
-            print(Fore.GREEN + "\n✅ Login berhasil sebagai " + Fore.YELLOW + Style.BRIGHT + "ADMIN")
-            print(Fore.CYAN + f"👋 Selamat datang, {admin['nama']}!")
+            print(Fore.GREEN + "\n✅ Login berhasil sebagai " + Fore.YELLOW + Style.BRIGHT + role.upper())
+            if role == "dokter":
+                print(Fore.CYAN + f"👋 Selamat datang, {account['nama']} - {account['spesialisasi']}")
+            else:
+                print(Fore.CYAN + f"👋 Selamat datang, {account['nama']}!")
             input(Fore.GREEN + "\n⏎ Tekan Enter untuk melanjutkan...")
-            return "admin", admin['id']
-    
-    # Check doctor credentials
-    doctor_data = read_csv("data/dokter.csv")
-    for doctor in doctor_data:
-        if doctor['username'] == username and doctor['password'] == password:
-            loading.stop()
-            print(Fore.GREEN + "\n✅ Login berhasil sebagai " + Fore.YELLOW + Style.BRIGHT + "DOKTER")
-            print(Fore.CYAN + f"👋 Selamat datang, {doctor['nama']} - {doctor['spesialisasi']}")
-            input(Fore.GREEN + "\n⏎ Tekan Enter untuk melanjutkan...")
-            return "dokter", doctor['id']
-    
-    # Check patient credentials
-    patient_data = read_csv("data/pasien.csv")
-    for patient in patient_data:
-        if patient['username'] == username and patient['password'] == password:
-            loading.stop()
-            print(Fore.GREEN + "\n✅ Login berhasil sebagai " + Fore.YELLOW + Style.BRIGHT + "PASIEN")
-            print(Fore.CYAN + f"👋 Selamat datang, {patient['nama']}!")
-            input(Fore.GREEN + "\n⏎ Tekan Enter untuk melanjutkan...")
-            return "pasien", patient['id']
+            return role, account['id']
     
     loading.stop()
     print(Fore.RED + "\n❌ Login gagal!")
@@ -116,13 +98,11 @@ def register_patient():
     loading = EnhancedLoadingAnimation("Memeriksa ketersediaan username", "dots")
     loading.start()
     
-    # Check if username already exists
-    patient_data = read_csv("data/pasien.csv")
-    for patient in patient_data:
-        if patient['username'].lower() == username.lower():
-            loading.stop()
-            show_error("Username sudah digunakan. Silakan pilih username lain.")
-            return register_patient()  # Retry registration
+    # Check if username already exists (in any account table, ignoring case)
+    if find_accounts(username, ignore_case=True):
+        loading.stop()
+        show_error("Username sudah digunakan. Silakan pilih username lain.")
+        return register_patient()  # Retry registration
     
     loading.stop()
     
@@ -146,19 +126,28 @@ def register_patient():
     loading.start()
     
     # Generate new ID
-    new_id = f"P{len(patient_data) + 1:03d}"
-    
-    # Add new patient
-    new_patient = {
-        'id': new_id,
-        'nama': name.strip(),
-        'username': username.strip(),
-        'password': password,
-        'kontak': contact.strip()
-    }
-    
-    patient_data.append(new_patient)
-    write_csv("data/pasien.csv", patient_data)
+    new_id = next_id("data/pasien.csv", "P")
+    
+    # Another session may have registered the same username meanwhile: only
+    # insert if the patient table is unchanged since it was checked again
+    while True:
+        version = table_version("data/pasien.csv")
+        if find_accounts(username, ignore_case=True):
+            loading.stop()
+            show_error("Username sudah digunakan. Silakan pilih username lain.")
+            return register_patient()  # Retry registration
+        
+        # Add new patient
+        new_patient = {
+            'id': new_id,
+            'nama': name.strip(),
+            'username': username.strip(),
+            'password': password,
+            'kontak': contact.strip()
+        }
+        
+        if append_csv("data/pasien.csv", new_patient, expected_version=version):
+            break
     
     loading.stop()
     
@@ -0,0 +1,60 @@
+# modules/config.py - Application configuration
+import os
+
+# Storage backend for the clinic tables: "csv" (default) or "sqlite"
+STORAGE_BACKEND = os.environ.get("PRAKTEK_STORAGE", "csv").lower()
+
+# Database file used when STORAGE_BACKEND is "sqlite"
+SQLITE_PATH = os.environ.get("PRAKTEK_SQLITE_PATH", "data/praktek.db")
+
+# Seconds to hold back write_csv calls so bursts are flushed as one group
+# commit (0 writes every table immediately)
+GROUP_COMMIT_WINDOW = float(os.environ.get("PRAKTEK_GROUP_COMMIT_WINDOW", "0"))
+
+# Tables whose row-level changes go to a write-ahead journal instead of
+# rewriting the whole CSV file (comma separated, empty by default), e.g.
+# PRAKTEK_JOURNAL_TABLES=pendaftaran
+JOURNAL_TABLES = tuple(name for name in os.environ.get("PRAKTEK_JOURNAL_TABLES", "").split(",") if name)
+
+# fsync every journal entry as it is written
+JOURNAL_FSYNC = os.environ.get("PRAKTEK_JOURNAL_FSYNC", "1") != "0"
+
+# Background compaction: how often to check (seconds) and how large a journal
+# may grow (bytes) before it is folded back into the base CSV file
+JOURNAL_COMPACT_INTERVAL = float(os.environ.get("PRAKTEK_JOURNAL_COMPACT_INTERVAL", "30"))
+JOURNAL_COMPACT_BYTES = int(os.environ.get("PRAKTEK_JOURNAL_COMPACT_BYTES", str(256 * 1024)))
+
+# Tables stored as fixed-width records (data/pendaftaran.dat instead of
+# data/pendaftaran.csv) so a single row is updated or deleted in place
+# instead of rewriting the file (comma separated, empty by default). Such
+# tables do not use the journal, and partitioned tables are never fixed-width.
+# An existing CSV file is converted the first time the application starts.
+FIXED_WIDTH_TABLES = tuple(name for name in os.environ.get("PRAKTEK_FIXED_WIDTH_TABLES", "").split(",") if name)
+
+# fsync every in-place change to a fixed-width table as it is written
+FIXED_WIDTH_FSYNC = os.environ.get("PRAKTEK_FIXED_WIDTH_FSYNC", "1") != "0"
+
+# Snapshots of parsed CSV tables, loaded instead of re-parsing the CSV when
+# its content has not changed; only written for files at least this large
+# (bytes, 0 disables snapshots and is the default), e.g. 65536
+SNAPSHOT_MIN_BYTES = int(os.environ.get("PRAKTEK_SNAPSHOT_MIN_BYTES", "0"))
+
+# Tables stored as one CSV file per month of their 'tanggal' column, e.g.
+# data/pendaftaran/2026-10.csv instead of data/pendaftaran.csv (comma
+# separated, empty by default). Existing rows are moved into the partitions
+# the first time the application starts with partitioning enabled.
+PARTITION_TABLES = tuple(name for name in os.environ.get("PRAKTEK_PARTITION_TABLES", "").split(",") if name)
+
+# Archiving: finished registrations (these statuses) whose date is more than
+# ARCHIVE_HORIZON_DAYS in the past are moved out of the live table into
+# compressed archive files when the application starts (0 disables it)
+ARCHIVE_HORIZON_DAYS = int(os.environ.get("PRAKTEK_ARCHIVE_HORIZON_DAYS", "0"))
+ARCHIVE_STATUSES = ("Dibatalkan", "Selesai")
+
+# Compression used for new archive files: "gzip" or "lzma"
+ARCHIVE_COMPRESSION = os.environ.get("PRAKTEK_ARCHIVE_COMPRESSION", "gzip").lower()
+
+# Persistent id sequences (one counter per table) and how many ids each
+# process reserves at a time; unused reserved ids are skipped, not reused
+SEQUENCE_PATH = os.environ.get("PRAKTEK_SEQUENCE_PATH", "data/sequences.csv")
+SEQUENCE_BLOCK = max(1, int(os.environ.get("PRAKTEK_SEQUENCE_BLOCK", "10")))
@@ -1,8 +1,71 @@
 # modules/data_manager.py - Data management module
+import atexit
 import csv
+import hashlib
+import io
+import itertools
+import mmap
 import os
-from datetime import datetime
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import MappingProxyType
 from colorama import Fore
+from . import archive
+from . import config
+from . import fixed_width
+from . import journal
+from . import locking
+from . import partitions
+from . import snapshot
+from . import sqlite_backend
+from .data_structures.account_index import UsernameIndex
+from .data_structures.registration_index import CANCELLED, PatientIndex, SlotIndex
+from .data_structures.schedule_index import ScheduleIndex, to_minutes
+from .data_structures.trigram_index import TrigramIndex
+from .data_structures.registration_table import COLUMNS as REGISTRATION_COLUMNS, RegistrationTable
+
+# Process-wide table cache: absolute path -> (signature, fieldnames, rows).
+# Rows stored here are shared and never changed in place (changes replace
+# the row dictionary); read_csv hands out read-only views of them, so a
+# caller that wants to change a row copies it first with dict(row).
+_table_cache = {}
+_cache_lock = threading.RLock()
+
+# absolute path -> (cache entry, read-only views of its rows), so repeated
+# reads of an unchanged table share one list of views
+_row_views = {}
+
+# Group commit state: tables written inside group_commit() (or within the
+# configured commit window) wait here until they are flushed together, as
+# absolute path -> (filename, fieldnames, rows, locked table). The locked
+# table's exclusive lock is held until then, so no other session can see the
+# old file under the version that write bumps.
+_pending_writes = {}
+_pending_syncs = set()
+_group_depth = 0
+_flush_timer = None
+
+# Tables holding login accounts, in the order they are checked at login
+ACCOUNT_TABLES = (
+    ("admin", "data/admin.csv"),
+    ("dokter", "data/dokter.csv"),
+    ("pasien", "data/pasien.csv"),
+)
+
+# Secondary indexes over cached tables: (absolute path, index class) ->
+# (table signature, index). Row-level changes made by this process are
+# applied to them directly; any other change rebuilds them on next use.
+_row_indexes = {}
+
+# Journaled tables touched by this process and the thread that compacts them
+_journaled_files = set()
+_compactor = None
+
+# Id numbers this process has reserved: sequence name -> [next, limit]
+_sequence_blocks = {}
 
 def initialize_data():
     """Initialize data files if they don't exist."""
@@ -41,52 +104,1238 @@ def initialize_data():
             writer.writerow(['J004', 'D003', 'Kamis', '09:00', '15:00', '12'])
             writer.writerow(['J005', 'D004', 'Jumat', '10:00', '16:00', '8'])
     
-    # Create pendaftaran.csv if it doesn't exist
-    if not os.path.exists("data/pendaftaran.csv"):
+    # Create pendaftaran.csv if it doesn't exist (partitioned tables create their months on demand)
+    if (not os.path.exists("data/pendaftaran.csv") and not _is_partitioned("data/pendaftaran.csv")
+            and not _is_fixed_width("data/pendaftaran.csv")):
         with open("data/pendaftaran.csv", 'w', newline='') as file:
             writer = csv.writer(file)
             writer.writerow(['id', 'pasien_id', 'jadwal_id', 'tanggal', 'status', 'nomor_antrian'])
+    
+    # Seed the database from the CSV files the first time the SQLite backend is used
+    if config.STORAGE_BACKEND == "sqlite":
+        sqlite_backend.migrate_csv_to_sqlite("data", only_empty=True)
+    
+    # Move existing rows into month partitions the first time partitioning is enabled
+    for table in config.PARTITION_TABLES:
+        _migrate_to_partitions(os.path.join("data", table + ".csv"))
+    
+    # Convert existing CSV files the first time fixed-width storage is enabled
+    for table in config.FIXED_WIDTH_TABLES:
+        _migrate_to_fixed_width(os.path.join("data", table + ".csv"))
+    
+    # Keep only live bookings in the registrations table
+    if config.ARCHIVE_HORIZON_DAYS > 0:
+        archive_finalized("data/pendaftaran.csv")
 
-def read_csv(filename):
-    """Read CSV file and return data as list of dictionaries."""
-    if not os.path.exists(filename):
-        return []
+def _migrate_to_partitions(filename):
+    """Split an unpartitioned CSV file into month partitions and set the original aside."""
+    if not _is_partitioned(filename):
+        return
+    
+    # Under the table lock, so no other session appends to the old file
+    # between reading it and setting it aside
+    with _exclusive(filename):
+        if not os.path.exists(filename):
+            return
+        if partitions.partition_files(filename):
+            return  # Already partitioned; leave the old file alone
+        
+        directory = partitions.partition_dir(filename)
+        os.makedirs(directory, exist_ok=True)
+        fieldnames, rows = _load_table(filename)
+        for name, part_rows in partitions.split_rows(rows).items():
+            _commit_table(os.path.join(directory, name + ".csv"), fieldnames, part_rows)
+        _fsync_directory(directory)
+        
+        os.replace(filename, filename + ".migrated")
+        journal.discard(filename)
+        snapshot.discard(filename)
+        invalidate_cache(filename)
+        locking.mark_changed(filename)
+
+def _migrate_to_fixed_width(filename):
+    """Convert a CSV file (and its journal) into a fixed-width file and set the CSV aside."""
+    path = fixed_width.data_path(filename)
+    if not _is_fixed_width(filename) or not os.path.exists(filename) or os.path.exists(path):
+        return
+    
+    with _cache_lock:
+        with locking.table_lock(filename, exclusive=True):
+            fieldnames, rows = _read_csv_file(filename)
+            entries, _, valid = journal.read_entries(filename)
+            if valid:
+                journal.apply_entries(rows, fieldnames, entries)
+            fixed_width.write_table(path, fieldnames, rows)
+            _fsync_directory(os.path.dirname(os.path.abspath(path)))
+            
+            os.replace(filename, filename + ".migrated")
+            journal.discard(filename)
+            snapshot.discard(filename)
+            invalidate_cache(filename)
+            locking.mark_changed(filename)
+
+def _sqlite_table(filename):
+    """Return the SQLite table backing a file when the SQLite backend is enabled."""
+    if config.STORAGE_BACKEND == "sqlite":
+        return sqlite_backend.table_for(filename)
+    return None
+
+def _table_name(filename):
+    """Return the table a CSV file stores; month partitions belong to their parent table."""
+    directory = os.path.basename(os.path.dirname(os.path.abspath(filename)))
+    if directory in config.PARTITION_TABLES:
+        return directory
+    return os.path.splitext(os.path.basename(filename))[0]
+
+def _is_journaled(filename):
+    """Return True if row-level changes to this CSV file go to its journal."""
+    if config.STORAGE_BACKEND == "sqlite" or _is_fixed_width(filename):
+        return False
+    return _table_name(filename) in config.JOURNAL_TABLES
+
+def _is_partitioned(filename):
+    """Return True if this table is stored as month partitions instead of one file."""
+    if config.STORAGE_BACKEND == "sqlite":
+        return False
+    directory = os.path.basename(os.path.dirname(os.path.abspath(filename)))
+    return (os.path.splitext(os.path.basename(filename))[0] in config.PARTITION_TABLES
+            and directory not in config.PARTITION_TABLES)
+
+def _is_fixed_width(filename):
+    """Return True if this table is stored as fixed-width records instead of CSV."""
+    if config.STORAGE_BACKEND == "sqlite":
+        return False
+    name = _table_name(filename)
+    return name in config.FIXED_WIDTH_TABLES and name not in config.PARTITION_TABLES
+
+def _storage_path(filename):
+    """Return the file that actually holds the rows of a table."""
+    if _is_fixed_width(filename):
+        return fixed_width.data_path(filename)
+    return filename
+
+def _partitions(filename, where=None):
+    """Return the partition files to read for a lookup, or None if the table is not partitioned.
+    
+    A lookup on a single tanggal only reads the partition of that month.
+    """
+    if not _is_partitioned(filename):
+        return None
+    return partitions.partition_files(filename, (where or {}).get(partitions.PARTITION_COLUMN))
+
+def _partition_of(filename, row_id):
+    """Return the partition file holding the row with the given id, trying recent months first."""
+    for part in reversed(partitions.partition_files(filename)):
+        if count_rows(part, id=row_id):
+            return part
+    return None
+
+def _file_signature(filename):
+    """Return (mtime, size, inode) used to detect changes to a file on disk."""
+    stat = os.stat(_storage_path(filename))
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+def _load_table(filename):
+    """Return (fieldnames, rows) for a CSV file, re-parsing only when it changed."""
+    table = _sqlite_table(filename)
+    if table:
+        return list(sqlite_backend.TABLES[table]), sqlite_backend.read_table(table)
+    
+    key = os.path.abspath(filename)
+    with _cache_lock:
+        pending = _pending_writes.get(key)
+        if pending:
+            return pending[1], pending[2]
+        
+        if _is_journaled(filename):
+            # The base file and its journal must be read as one consistent pair
+            with locking.table_lock(filename):
+                return _load_journaled_table(filename, key)
+        
+        try:
+            signature = _file_signature(filename)
+        except FileNotFoundError:
+            _table_cache.pop(key, None)
+            return [], []
+        
+        entry = _table_cache.get(key)
+        if entry and entry[0] == signature:
+            return entry[1], entry[2]
+        
+        # Parse under a shared lock so no other session rewrites the file meanwhile
+        with locking.table_lock(filename):
+            signature = _file_signature(filename)
+            fieldnames, rows = _parse_csv(filename, signature)
+        _table_cache[key] = (signature, fieldnames, rows)
+        return fieldnames, rows
+
+def _parse_csv(filename, signature):
+    """Parse a CSV file into (fieldnames, rows), going through its binary snapshot.
+    
+    signature must be taken before the file is read, so a snapshot written
+    from a file that changed while it was being parsed never validates.
+    Fixed-width tables are read straight from their record file.
+    """
+    if _is_fixed_width(filename):
+        return fixed_width.read_table(fixed_width.data_path(filename))
     
-    with open(filename, 'r', newline='') as file:
+    if config.SNAPSHOT_MIN_BYTES <= 0 or signature[1] < config.SNAPSHOT_MIN_BYTES:
+        return _read_csv_file(filename)
+    
+    # The snapshot must match the content as well as the size and mtime;
+    # the same bytes are parsed if it does not, so the two always agree
+    with open(filename, 'rb') as file:
+        data = file.read()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    loaded = snapshot.load(filename, signature, digest)
+    if loaded is not None:
+        return loaded
+    
+    reader = csv.DictReader(io.StringIO(data.decode('utf-8-sig'), newline=''))
+    rows = list(reader)
+    fieldnames = list(reader.fieldnames or [])
+    snapshot.save(filename, signature, digest, fieldnames, rows)
+    return fieldnames, rows
+
+def _read_csv_file(filename):
+    with open(filename, 'r', newline='', encoding='utf-8-sig') as file:
         reader = csv.DictReader(file)
-        return list(reader)
+        rows = list(reader)
+        return list(reader.fieldnames or []), rows
 
-def write_csv(filename, data):
-    """Write data to CSV file."""
+def _load_journaled_table(filename, key):
+    """Return (fieldnames, rows) for the base CSV with its journal replayed on top."""
+    try:
+        base_signature = _file_signature(filename)
+    except FileNotFoundError:
+        base_signature = None
+    journal_bytes = journal.journal_size(filename)
+    
+    # Same base file: only replay the journal entries we have not seen yet
+    entry = _table_cache.get(key)
+    if entry and entry[0][0] == base_signature and entry[0][1] <= journal_bytes:
+        fieldnames, rows = entry[1], entry[2]
+        if entry[0][1] == journal_bytes:
+            return fieldnames, rows
+        entries, offset, valid = journal.read_entries(filename, entry[0][1])
+        if valid:
+            journal.apply_entries(rows, fieldnames, entries)
+            _table_cache[key] = ((base_signature, offset), fieldnames, rows)
+            return fieldnames, rows
+    
+    fieldnames, rows = [], []
+    if base_signature is not None:
+        fieldnames, rows = _parse_csv(filename, base_signature)
+    
+    entries, offset, valid = journal.read_entries(filename)
+    if not valid:
+        # Left behind by a crash after the base file was already replaced
+        journal.discard(filename)
+    if not fieldnames:
+        fieldnames = next((list(e['row'].keys()) for e in entries if e.get('op') == 'insert'), [])
+    journal.apply_entries(rows, fieldnames, entries)
+    
+    _table_cache[key] = ((base_signature, offset), fieldnames, rows)
+    return fieldnames, rows
+
+def invalidate_cache(filename=None):
+    """Drop cached rows for one file, or for every file if none is given."""
+    with _cache_lock:
+        if filename is None:
+            _table_cache.clear()
+            _row_views.clear()
+        else:
+            _table_cache.pop(os.path.abspath(filename), None)
+            _row_views.pop(os.path.abspath(filename), None)
+
+def read_csv(filename):
+    """Read CSV file and return data as list of read-only row mappings.
+    
+    Rows are shared with the table cache instead of copied; use dict(row)
+    to get a row that can be changed. The list itself is the caller's own.
+    """
+    table = _sqlite_table(filename)
+    if table:
+        return [MappingProxyType(row) for row in sqlite_backend.read_table(table)]
+    
+    parts = _partitions(filename)
+    if parts is not None:
+        return [row for part in parts for row in read_csv(part)]
+    
+    fieldnames, rows = _load_table(filename)
+    return list(_read_only_rows(filename, rows))
+
+def _read_only_rows(filename, rows):
+    """Return read-only views of a table's rows, built once per cache entry."""
+    key = os.path.abspath(filename)
+    with _cache_lock:
+        entry = _table_cache.get(key)
+        if key in _pending_writes or entry is None or entry[2] is not rows:
+            return [MappingProxyType(row) for row in rows]
+        # Every change stores a new cache entry, so the entry identifies the content
+        cached = _row_views.get(key)
+        if cached is None or cached[0] is not entry:
+            cached = _row_views[key] = (entry, [MappingProxyType(row) for row in rows])
+        return cached[1]
+
+def iter_csv(filename, include_archive=False):
+    """Yield rows of a CSV file one at a time instead of building a list.
+    
+    The file is read lazily, so callers that only filter or count keep memory
+    flat and may stop early. Tables already cached or with unsaved changes
+    are served from memory. With include_archive, archived rows come first.
+    Every row is a read-only mapping, as from read_csv, wherever it comes from.
+    """
+    if include_archive:
+        yield from map(MappingProxyType, archive.iter_rows(filename))
+    
+    table = _sqlite_table(filename)
+    if table:
+        yield from map(MappingProxyType, sqlite_backend.iter_table(table))
+        return
+    
+    parts = _partitions(filename)
+    if parts is not None:
+        for part in parts:
+            yield from iter_csv(part)
+        return
+    
+    rows = _fresh_rows(filename)
+    if rows is not None:
+        yield from _read_only_rows(filename, rows)
+        return
+    
+    if not os.path.exists(filename):
+        return
+    with open(filename, 'r', newline='', encoding='utf-8-sig') as file:
+        yield from map(MappingProxyType, csv.DictReader(file))
+
+def write_csv(filename, data, expected_version=None):
+    """Write data to CSV file.
+    
+    With expected_version (from table_version), nothing is written and False
+    is returned if another session wrote the table after that version.
+    """
     if not data:
+        return True
+    
+    with _exclusive(filename) as version:
+        if expected_version is not None and version != expected_version:
+            return False
+        _replace_rows(filename, list(data[0].keys()), [dict(row) for row in data])
+        locking.mark_changed(filename)
+        _commit_checked(expected_version)
+        return True
+
+def _commit_checked(expected_version):
+    """Flush deferred writes now if the change that made them was version-checked.
+    
+    A checked change is a commit point: it reaches disk before the table
+    lock is released instead of waiting for the group commit window.
+    """
+    if expected_version is not None:
+        flush_pending_writes()
+
+def table_version(filename):
+    """Return a number that changes every time any session writes the table.
+    
+    Read it before reading the rows a change depends on, then pass it as
+    expected_version to the write so a concurrent change is detected.
+    """
+    return locking.read_version(filename)
+
+@contextmanager
+def _exclusive(filename):
+    """Hold the in-process cache lock and the table's exclusive file lock."""
+    with _cache_lock:
+        with locking.table_lock(filename, exclusive=True) as version:
+            yield version
+
+def _replace_rows(filename, fieldnames, rows):
+    """Replace the whole content of a table; unlike write_csv, rows may be empty."""
+    table = _sqlite_table(filename)
+    if table:
+        sqlite_backend.write_table(table, rows)
+    elif _is_partitioned(filename):
+        _write_partitions(filename, fieldnames, rows)
+    else:
+        _write_table(filename, fieldnames, rows)
+
+def _write_table(filename, fieldnames, rows, lock_name=None):
+    key = os.path.abspath(filename)
+    with _cache_lock:
+        if _group_depth or config.GROUP_COMMIT_WINDOW > 0:
+            # Defer the write; later writes to the same table replace this one
+            pending = _pending_writes.get(key)
+            if pending:
+                lock_name = pending[3]
+            else:
+                lock_name = lock_name or filename
+                locking.hold(lock_name)
+            _pending_writes[key] = (filename, fieldnames, rows, lock_name)
+            if not _group_depth:
+                _schedule_flush()
+            return
+        
+        _commit_table(filename, fieldnames, rows)
+        _fsync_directory(os.path.dirname(key))
+
+def _write_partitions(filename, fieldnames, rows):
+    """Write a partitioned table, rewriting only the months whose rows changed."""
+    directory = partitions.partition_dir(filename)
+    os.makedirs(directory, exist_ok=True)
+    groups = partitions.split_rows(rows)
+    with group_commit():
+        for part in partitions.partition_files(filename):
+            name = os.path.splitext(os.path.basename(part))[0]
+            if name not in groups:
+                _write_table(part, fieldnames, [], lock_name=filename)
+        for name, part_rows in groups.items():
+            part = os.path.join(directory, name + ".csv")
+            if _load_table(part)[1] != part_rows:
+                _write_table(part, fieldnames, part_rows, lock_name=filename)
+
+def _commit_table(filename, fieldnames, rows):
+    """Atomically replace a CSV file: write a temp file, fsync it, then rename it."""
+    with locking.table_lock(filename, exclusive=True):
+        _replace_file(filename, fieldnames, rows)
+        locking.mark_changed(filename)
+
+def _replace_file(filename, fieldnames, rows):
+    key = os.path.abspath(filename)
+    if _is_fixed_width(filename):
+        fixed_width.write_table(fixed_width.data_path(filename), fieldnames, rows)
+        _table_cache[key] = (_file_signature(filename), fieldnames, rows)
+        return
+    
+    directory = os.path.dirname(key)
+    fd, temp_path = tempfile.mkstemp(prefix="." + os.path.basename(key) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames, restval='', extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+            file.flush()
+            os.fsync(file.fileno())
+        
+        if os.path.exists(key):
+            os.chmod(temp_path, os.stat(key).st_mode & 0o777)
+        else:
+            os.chmod(temp_path, 0o644)
+        os.replace(temp_path, key)
+    except BaseException:
+        invalidate_cache(filename)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    
+    # The rows just written are exactly what a re-read would return
+    signature = _file_signature(key)
+    if _is_journaled(filename):
+        # The new base already holds every journaled change
+        journal.discard(filename)
+        signature = (signature, 0)
+    _table_cache[key] = (signature, fieldnames, rows)
+
+def _fsync_directory(directory):
+    """Flush a directory entry so a rename inside it survives a crash."""
+    if os.name == 'nt':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _schedule_flush():
+    global _flush_timer
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(config.GROUP_COMMIT_WINDOW, flush_pending_writes)
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+def flush_pending_writes():
+    """Write every deferred table to disk, syncing each directory only once."""
+    global _flush_timer
+    with _cache_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        
+        pending = list(_pending_writes.values())
+        _pending_writes.clear()
+        syncs = list(_pending_syncs)
+        _pending_syncs.clear()
+        
+        directories = set()
+        try:
+            for filename, fieldnames, rows, _ in pending:
+                _commit_table(filename, fieldnames, rows)
+                directories.add(os.path.dirname(os.path.abspath(filename)))
+            for path in syncs:
+                if os.path.exists(path):
+                    with open(path, 'a') as file:
+                        os.fsync(file.fileno())
+                    directories.add(os.path.dirname(os.path.abspath(path)))
+            for directory in directories:
+                _fsync_directory(directory)
+        finally:
+            # The tables are on disk: let other sessions in
+            for *_, lock_name in pending:
+                locking.release(lock_name)
+
+@contextmanager
+def group_commit():
+    """Coalesce the write_csv calls made inside the block into a single flush."""
+    global _group_depth
+    with _cache_lock:
+        _group_depth += 1
+    try:
+        yield
+    finally:
+        with _cache_lock:
+            _group_depth -= 1
+            if _group_depth == 0:
+                flush_pending_writes()
+
+atexit.register(flush_pending_writes)
+
+def append_csv(filename, row, fsync=False, expected_version=None):
+    """Append a single row to a CSV file without rewriting the existing rows.
+    
+    With expected_version, the row is only added (and True returned) if no
+    other session wrote the table since that version was read.
+    """
+    with _exclusive(filename) as version:
+        if expected_version is not None and version != expected_version:
+            return False
+        _append_row(filename, dict(row), fsync)
+        locking.mark_changed(filename)
+        _commit_checked(expected_version)
+        return True
+
+def _append_row(filename, row, fsync):
+    table = _sqlite_table(filename)
+    if table:
+        sqlite_backend.insert_row(table, row)
+        return
+    
+    if _is_partitioned(filename):
+        part = partitions.partition_file(filename, row.get(partitions.PARTITION_COLUMN))
+        os.makedirs(os.path.dirname(part), exist_ok=True)
+        append_csv(part, row, fsync)
+        return
+    
+    if _is_fixed_width(filename):
+        _fixed_width_change(filename, {'op': 'insert', 'id': row.get('id'), 'row': row}, fsync)
         return
     
-    with open(filename, 'w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=data[0].keys())
-        writer.writeheader()
-        writer.writerows(data)
+    if _is_journaled(filename):
+        _journal_change(filename, {'op': 'insert', 'id': row.get('id'), 'row': row}, fsync)
+        return
+    
+    key = os.path.abspath(filename)
+    with _cache_lock:
+        pending = _pending_writes.get(key)
+        if pending:
+            # The table is waiting for a group flush; add the row to that copy
+            pending[2].append({name: row.get(name, '') for name in pending[1]})
+            return
+        
+        fieldnames, rows = _load_table(filename)
+        entry = _table_cache.get(key)
+        if not fieldnames:
+            fieldnames = list(row.keys())
+        
+        # Make sure the new row starts on its own line
+        needs_header = True
+        needs_newline = False
+        if os.path.exists(filename) and os.path.getsize(filename) > 0:
+            needs_header = False
+            with open(filename, 'rb') as file:
+                file.seek(-1, os.SEEK_END)
+                needs_newline = file.read(1) not in (b'\n', b'\r')
+        
+        with open(filename, 'a', newline='', encoding='utf-8') as file:
+            if needs_newline:
+                file.write('\r\n')
+            writer = csv.DictWriter(file, fieldnames=fieldnames, restval='', extrasaction='ignore')
+            if needs_header:
+                writer.writeheader()
+            writer.writerow(row)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        
+        # Extend the cached table in place instead of re-parsing the file
+        if entry:
+            new_row = {name: row.get(name, '') for name in fieldnames}
+            rows.append(new_row)
+            signature = _file_signature(filename)
+            _table_cache[key] = (signature, fieldnames, rows)
+            _update_indexes(key, entry[0], signature, {'op': 'insert', 'id': new_row.get('id'), 'row': new_row})
+
+def update_row(filename, row_id, changes, expected_version=None):
+    """Change some columns of the row with the given id.
+    
+    Returns False without changing anything if expected_version is given and
+    another session wrote the table since that version was read.
+    """
+    with _exclusive(filename) as version:
+        if expected_version is not None and version != expected_version:
+            return False
+        _update_row(filename, row_id, changes)
+        locking.mark_changed(filename)
+        _commit_checked(expected_version)
+        return True
+
+def _update_row(filename, row_id, changes):
+    table = _sqlite_table(filename)
+    if table:
+        sqlite_backend.update_row(table, row_id, changes)
+        return
+    
+    if _is_partitioned(filename):
+        part = _partition_of(filename, row_id)
+        if part is None:
+            return
+        new_date = changes.get(partitions.PARTITION_COLUMN)
+        if new_date is not None and partitions.partition_file(filename, new_date) != part:
+            # The row moves to another month; add the new copy before removing
+            # the old one so an interruption can never lose it
+            row = find_rows(part, id=row_id)[0]
+            row.update({k: v for k, v in changes.items() if k in row})
+            with group_commit():
+                append_csv(filename, row)
+                delete_row(part, row_id)
+        else:
+            update_row(part, row_id, changes)
+        return
+    
+    if _is_fixed_width(filename):
+        _fixed_width_change(filename, {'op': 'update', 'id': row_id, 'changes': changes})
+        return
+    
+    if _is_journaled(filename):
+        _journal_change(filename, {'op': 'update', 'id': row_id, 'changes': changes})
+        return
+    
+    rows = read_csv(filename)
+    for i, row in enumerate(rows):
+        if row['id'] == row_id:
+            rows[i] = dict(row)
+            rows[i].update({k: v for k, v in changes.items() if k in row})
+            write_csv(filename, rows)
+            break
+
+def delete_row(filename, row_id, expected_version=None):
+    """Remove the row with the given id.
+    
+    Returns False without changing anything if expected_version is given and
+    another session wrote the table since that version was read.
+    """
+    with _exclusive(filename) as version:
+        if expected_version is not None and version != expected_version:
+            return False
+        _delete_row(filename, row_id)
+        locking.mark_changed(filename)
+        _commit_checked(expected_version)
+        return True
+
+def _delete_row(filename, row_id):
+    table = _sqlite_table(filename)
+    if table:
+        sqlite_backend.delete_row(table, row_id)
+        return
+    
+    if _is_partitioned(filename):
+        part = _partition_of(filename, row_id)
+        if part:
+            delete_row(part, row_id)
+        return
+    
+    if _is_fixed_width(filename):
+        _fixed_width_change(filename, {'op': 'delete', 'id': row_id})
+        return
+    
+    if _is_journaled(filename):
+        _journal_change(filename, {'op': 'delete', 'id': row_id})
+        return
+    
+    rows = read_csv(filename)
+    remaining = [row for row in rows if row['id'] != row_id]
+    if remaining:
+        if len(remaining) != len(rows):
+            write_csv(filename, remaining)
+    elif rows:
+        # write_csv skips empty data, so write the header-only file directly
+        fieldnames, _ = _load_table(filename)
+        with _cache_lock:
+            _commit_table(filename, fieldnames, [])
+            _fsync_directory(os.path.dirname(os.path.abspath(filename)))
+
+def _journal_change(filename, entry, fsync=False):
+    """Record one row-level change in the table journal and apply it to the cache."""
+    key = os.path.abspath(filename)
+    with _cache_lock:
+        pending = _pending_writes.get(key)
+        if pending:
+            # A full rewrite is already queued; fold the change into it
+            journal.apply_entries(pending[2], pending[1], [entry])
+            return
+        
+        fieldnames, rows = _load_table(filename)
+        cached = _table_cache.get(key)
+        
+        sync_now = (fsync or config.JOURNAL_FSYNC) and not _group_depth
+        if journal.append_entry(filename, entry, fsync=sync_now):
+            _fsync_directory(os.path.dirname(key))
+        if _group_depth:
+            _pending_syncs.add(journal.journal_path(filename))
+        
+        if cached:
+            if not fieldnames and entry['op'] == 'insert':
+                fieldnames = list(entry['row'].keys())
+            journal.apply_entries(rows, fieldnames, [entry])
+            signature = (cached[0][0], journal.journal_size(filename))
+            _table_cache[key] = (signature, fieldnames, rows)
+            _update_indexes(key, cached[0], signature, entry)
+        
+        _journaled_files.add(filename)
+        _start_compactor()
+
+def _fixed_width_change(filename, entry, fsync=False):
+    """Write one row-level change (a journal-style entry) into a fixed-width table in place."""
+    key = os.path.abspath(filename)
+    path = fixed_width.data_path(filename)
+    with _cache_lock:
+        pending = _pending_writes.get(key)
+        if pending:
+            # A full rewrite is already queued; fold the change into it
+            journal.apply_entries(pending[2], pending[1], [entry])
+            return
+        
+        fieldnames, rows = _load_table(filename)
+        cached = _table_cache.get(key)
+        if not fieldnames and entry['op'] == 'insert':
+            fieldnames = list(entry['row'].keys())
+        
+        sync_now = (fsync or config.FIXED_WIDTH_FSYNC) and not _group_depth
+        try:
+            if entry['op'] == 'insert':
+                fixed_width.insert_row(path, fieldnames, entry['row'], fsync=sync_now)
+            elif entry['op'] == 'update':
+                fixed_width.update_row(path, entry['id'], entry['changes'], fsync=sync_now)
+            else:
+                fixed_width.delete_row(path, entry['id'], fsync=sync_now)
+        except ValueError:
+            # A value is wider than its column: rewrite the file with wider columns
+            rows = [dict(row) for row in rows]
+            journal.apply_entries(rows, fieldnames, [entry])
+            _write_table(filename, fieldnames, rows)
+            return
+        if _group_depth:
+            _pending_syncs.add(path)
+        
+        if cached:
+            journal.apply_entries(rows, fieldnames, [entry])
+            signature = _file_signature(filename)
+            _table_cache[key] = (signature, fieldnames, rows)
+            _update_indexes(key, cached[0], signature, entry)
+
+def _table_index(filename, index_class):
+    """Return an index_class index over a table, rebuilt only when the table changed."""
+    key = os.path.abspath(filename)
+    table = _sqlite_table(filename)
+    if table:
+        # No row cache to compare against; the database's change counter
+        # tells whether the table was written since the index was built
+        with _cache_lock:
+            signature = sqlite_backend.table_signature(table)
+            cached = _row_indexes.get((key, index_class))
+            if cached and cached[0] == signature:
+                return cached[1]
+            index = index_class(sqlite_backend.read_table(table))
+            _row_indexes[(key, index_class)] = (signature, index)
+            return index
+    
+    with _cache_lock:
+        fieldnames, rows = _load_table(filename)
+        entry = _table_cache.get(key)
+        if key in _pending_writes or not entry:
+            return index_class(rows)
+        
+        cached = _row_indexes.get((key, index_class))
+        if cached and cached[0] == entry[0]:
+            return cached[1]
+        index = index_class(rows)
+        _row_indexes[(key, index_class)] = (entry[0], index)
+        return index
+
+def _update_indexes(key, old_signature, new_signature, entry):
+    """Carry the indexes of a table over a row-level change made by this process."""
+    for index_key, (signature, index) in list(_row_indexes.items()):
+        if index_key[0] != key:
+            continue
+        if signature == old_signature:
+            index.apply(entry)
+            _row_indexes[index_key] = (new_signature, index)
+        else:
+            del _row_indexes[index_key]
+
+def compact_journal(filename):
+    """Fold a table's journal into its base CSV file and remove the journal."""
+    with _exclusive(filename):
+        if os.path.abspath(filename) in _pending_writes:
+            flush_pending_writes()
+        if journal.journal_size(filename) == 0:
+            return
+        fieldnames, rows = _load_table(filename)
+        _commit_table(filename, fieldnames, rows)
+        _fsync_directory(os.path.dirname(os.path.abspath(filename)))
+
+def compact_journals(min_bytes=1):
+    """Compact every journal this process has written that is at least min_bytes long."""
+    for filename in list(_journaled_files):
+        if journal.journal_size(filename) >= min_bytes:
+            compact_journal(filename)
+
+def _compact_loop():
+    while True:
+        time.sleep(config.JOURNAL_COMPACT_INTERVAL)
+        try:
+            compact_journals(config.JOURNAL_COMPACT_BYTES)
+        except OSError:
+            # Try again on the next round; the journal is still intact
+            pass
+
+def _start_compactor():
+    global _compactor
+    if _compactor is None and config.JOURNAL_COMPACT_INTERVAL > 0:
+        _compactor = threading.Thread(target=_compact_loop, daemon=True)
+        _compactor.start()
+
+atexit.register(compact_journals)
+
+def _matches(row, where, exclude):
+    for column, value in where.items():
+        if row.get(column) != value:
+            return False
+    for column, value in (exclude or {}).items():
+        if row.get(column) == value:
+            return False
+    return True
+
+def _fresh_rows(filename):
+    """Return the in-memory rows of a table if they are current, otherwise None.
+    
+    Journaled tables with outstanding changes and tables waiting for a group
+    flush are always served from memory, since the base file alone is stale.
+    So are fixed-width tables, whose record file cannot be scanned as CSV.
+    """
+    key = os.path.abspath(filename)
+    with _cache_lock:
+        if (key in _pending_writes or _is_fixed_width(filename)
+                or (_is_journaled(filename) and journal.journal_size(filename))):
+            return _load_table(filename)[1]
+        
+        entry = _table_cache.get(key)
+        if not entry:
+            return None
+        try:
+            signature = _file_signature(filename)
+        except FileNotFoundError:
+            return None
+        if _is_journaled(filename):
+            signature = (signature, 0)
+        return entry[2] if entry[0] == signature else None
+
+def _split_line(line):
+    """Split one raw CSV line into byte fields, using the csv module only for quoted lines."""
+    if b'"' in line:
+        fields = next(csv.reader([line.decode('utf-8')]), [])
+        return [field.encode('utf-8') for field in fields]
+    return line.rstrip(b'\r\n').split(b',')
+
+def _scan_csv(filename, columns, where, exclude):
+    """Yield tuples of the projected byte fields of matching rows.
+    
+    The file is memory-mapped and read line by line; lines that cannot match
+    the first equality predicate are skipped before they are split. Quoted
+    fields spanning several lines are not supported.
+    """
+    with open(filename, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            names = [name.decode('utf-8-sig') for name in _split_line(mapped.readline())]
+            index = {name: i for i, name in enumerate(names)}
+            conditions = [(index[column], str(value).encode('utf-8')) for column, value in where.items()]
+            exclusions = [(index[column], str(value).encode('utf-8')) for column, value in (exclude or {}).items()]
+            projection = [index[column] for column in (names if columns is None else columns)]
+            needle = next((value for i, value in conditions if b'"' not in value), None)
+            width = len(names)
+            quoted = mapped.find(b'"') != -1
+            
+            for line in iter(mapped.readline, b''):
+                if needle is not None and needle not in line:
+                    continue
+                if quoted and b'"' in line:
+                    fields = _split_line(line)
+                else:
+                    fields = line.rstrip(b'\r\n').split(b',')
+                if len(fields) < width:
+                    if fields == [b''] or not fields:
+                        continue  # blank line
+                    fields = fields + [b''] * (width - len(fields))
+                
+                matched = True
+                for i, value in conditions:
+                    if fields[i] != value:
+                        matched = False
+                        break
+                for i, value in exclusions:
+                    if fields[i] == value:
+                        matched = False
+                        break
+                if matched:
+                    yield tuple([fields[i] for i in projection])
+
+def find_rows(filename, exclude=None, **where):
+    """Return rows whose columns equal the given values (and differ from exclude)."""
+    table = _sqlite_table(filename)
+    if table:
+        return sqlite_backend.select_rows(table, where, exclude)
+    
+    parts = _partitions(filename, where)
+    if parts is not None:
+        return [row for part in parts for row in find_rows(part, exclude, **where)]
+    
+    fieldnames, rows = _load_table(filename)
+    return [dict(row) for row in rows if _matches(row, where, exclude)]
+
+def count_rows(filename, exclude=None, **where):
+    """Count rows whose columns equal the given values (and differ from exclude)."""
+    table = _sqlite_table(filename)
+    if table:
+        return sqlite_backend.count_rows(table, where, exclude)
+    
+    parts = _partitions(filename, where)
+    if parts is not None:
+        return sum(count_rows(part, exclude, **where) for part in parts)
+    
+    rows = _fresh_rows(filename)
+    if rows is None:
+        if not os.path.exists(filename):
+            return 0
+        return sum(1 for _ in _scan_csv(filename, [], where, exclude))
+    return sum(1 for row in rows if _matches(row, where, exclude))
+
+def count_by(filename, column, exclude=None, **where):
+    """Count matching rows grouped by one column, e.g. registrations per schedule."""
+    table = _sqlite_table(filename)
+    if table:
+        return sqlite_backend.count_by(table, column, where, exclude)
+    
+    counts = {}
+    parts = _partitions(filename, where)
+    if parts is not None:
+        for part in parts:
+            for value, count in count_by(part, column, exclude, **where).items():
+                counts[value] = counts.get(value, 0) + count
+        return counts
+    
+    rows = _fresh_rows(filename)
+    if rows is None:
+        if not os.path.exists(filename):
+            return {}
+        for (value,) in _scan_csv(filename, [column], where, exclude):
+            counts[value] = counts.get(value, 0) + 1
+        return {value.decode('utf-8'): count for value, count in counts.items()}
+    
+    for row in rows:
+        if _matches(row, where, exclude):
+            value = row.get(column, '')
+            counts[value] = counts.get(value, 0) + 1
+    return counts
+
+def active_registrations(schedule_id, tanggal=None, filename="data/pendaftaran.csv"):
+    """Return the registrations of a schedule that are not cancelled, on one date or on all dates.
+    
+    Served from an index by (jadwal_id, tanggal) that follows every insert,
+    cancellation and reschedule, so only the matching registrations are touched.
+    """
+    table = _sqlite_table(filename)
+    if table:
+        where = {'jadwal_id': schedule_id}
+        if tanggal is not None:
+            where['tanggal'] = tanggal
+        return sqlite_backend.select_rows(table, where, {'status': CANCELLED})
+    
+    parts = _partitions(filename, {'tanggal': tanggal} if tanggal is not None else None)
+    files = [filename] if parts is None else parts
+    return [dict(row) for part in files for row in _table_index(part, SlotIndex).registrations(schedule_id, tanggal)]
+
+def active_counts(filename="data/pendaftaran.csv"):
+    """Return {jadwal_id: number of registrations that are not cancelled}, from the same index."""
+    table = _sqlite_table(filename)
+    if table:
+        return sqlite_backend.count_by(table, 'jadwal_id', {}, {'status': CANCELLED})
+    
+    parts = _partitions(filename)
+    if parts is None:
+        return _table_index(filename, SlotIndex).counts()
+    counts = {}
+    for part in parts:
+        for schedule_id, count in _table_index(part, SlotIndex).counts().items():
+            counts[schedule_id] = counts.get(schedule_id, 0) + count
+    return counts
+
+def get_patient_registrations(patient_id, filename="data/pendaftaran.csv", include_archive=False):
+    """Return the registrations of one patient sorted by tanggal, from an index by pasien_id.
+    
+    Only the patient's own rows are copied, however large the table is. With
+    include_archive, the patient's archived rows are merged in as well.
+    """
+    table = _sqlite_table(filename)
+    parts = None if table else _partitions(filename)
+    if table:
+        rows = sqlite_backend.select_rows(table, {'pasien_id': patient_id})
+    else:
+        files = [filename] if parts is None else parts
+        rows = [dict(row) for part in files for row in _table_index(part, PatientIndex).registrations(patient_id)]
+    
+    if include_archive:
+        rows = [row for row in archive.iter_rows(filename) if row.get('pasien_id') == patient_id] + rows
+    if table or parts is not None or include_archive:
+        # Rows from several sources: merge them back into tanggal order
+        rows.sort(key=lambda row: row.get('tanggal') or '')
+    return rows
+
+def load_registration_table(filename="data/pendaftaran.csv", include_archive=False):
+    """Load registrations into a compact column-oriented RegistrationTable.
+    
+    The table is filled straight from the mmap scan when the file is current,
+    so no per-row dictionaries are built along the way. With include_archive,
+    archived rows are streamed in first.
+    """
+    parts = _partitions(filename)
+    files = [filename] if parts is None else parts
+    rows = (row for part in files for row in _registration_rows(part))
+    if include_archive:
+        rows = itertools.chain(archive.iter_rows(filename), rows)
+    return RegistrationTable.from_rows(rows)
+
+def _registration_rows(filename):
+    table = _sqlite_table(filename)
+    if table:
+        return sqlite_backend.iter_table(table)
+    
+    rows = _fresh_rows(filename)
+    if rows is not None:
+        return rows
+    
+    if not os.path.exists(filename):
+        return []
+    return (
+        [value.decode('utf-8') for value in values]
+        for values in _scan_csv(filename, REGISTRATION_COLUMNS, {}, None)
+    )
+
+def next_id(filename, prefix, width=3):
+    """Return a new unique id for a table, e.g. next_id("data/pendaftaran.csv", "R") -> "R042".
+    
+    Numbers come from a persistent per-table counter instead of the row count,
+    so the table is not loaded and ids are never reused after deletions or by
+    concurrent sessions. Each process reserves SEQUENCE_BLOCK numbers at once.
+    """
+    name = _table_name(filename)
+    with _cache_lock:
+        block = _sequence_blocks.get(name)
+        if not block or block[0] >= block[1]:
+            start = _reserve_ids(filename, name, prefix, config.SEQUENCE_BLOCK)
+            block = _sequence_blocks[name] = [start, start + config.SEQUENCE_BLOCK]
+        number = block[0]
+        block[0] += 1
+    return f"{prefix}{number:0{width}d}"
+
+def _reserve_ids(filename, name, prefix, count):
+    """Atomically take count numbers from the sequence file and return the first."""
+    path = config.SEQUENCE_PATH
+    with locking.table_lock(path, exclusive=True):
+        fieldnames, rows = _load_table(path)
+        counters = {row['nama']: int(row['berikutnya']) for row in rows}
+        start = counters.get(name)
+        if start is None:
+            # First use: continue after the highest id already in the table
+            start = _highest_id(filename, prefix) + 1
+        counters[name] = start + count
+        
+        _commit_table(path, ['nama', 'berikutnya'],
+                      [{'nama': key, 'berikutnya': str(value)} for key, value in sorted(counters.items())])
+        _fsync_directory(os.path.dirname(os.path.abspath(path)))
+    return start
+
+def _highest_id(filename, prefix):
+    highest = 0
+    for row in iter_csv(filename, include_archive=True):
+        number = row.get('id', '')[len(prefix):]
+        if row.get('id', '').startswith(prefix) and number.isdigit():
+            highest = max(highest, int(number))
+    return highest
+
+def has_archive(filename):
+    """Return True if some rows of this table have been moved to the archive."""
+    return bool(archive.archive_files(filename))
+
+def archive_finalized(filename="data/pendaftaran.csv", horizon_days=None, today=None):
+    """Move finished rows dated more than horizon_days ago into the compressed archive.
+    
+    Returns the number of rows moved. Rows that are already in the archive
+    (left behind by an interrupted run) are dropped from the table without
+    being archived twice.
+    """
+    if horizon_days is None:
+        horizon_days = config.ARCHIVE_HORIZON_DAYS
+    cutoff = ((today or datetime.now()) - timedelta(days=horizon_days)).strftime("%Y-%m-%d")
+    
+    # The whole read-modify-write holds the table lock, so a registration
+    # another session adds meanwhile is not lost by the rewrite
+    with _exclusive(filename):
+        rows = read_csv(filename)
+        finished = [row for row in rows
+                    if row.get('status') in config.ARCHIVE_STATUSES and _is_date(row.get('tanggal'))
+                    and row['tanggal'] < cutoff]
+        if not finished:
+            return 0
+        
+        fieldnames = list(rows[0].keys())
+        done = archive.archived_ids(filename)
+        new_rows = [row for row in finished if row['id'] not in done]
+        if new_rows:
+            archive.write_batch(filename, fieldnames, new_rows, config.ARCHIVE_COMPRESSION)
+        
+        moved = {row['id'] for row in finished}
+        _replace_rows(filename, fieldnames, [dict(row) for row in rows if row['id'] not in moved])
+        locking.mark_changed(filename)
+        return len(new_rows)
+
+def _is_date(value):
+    try:
+        datetime.strptime(value or '', "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
+
+def find_accounts(username, ignore_case=False):
+    """Return [(role, row)] for every account with this username, admins first.
+    
+    Each account table is looked up in a username index that is built once
+    and follows registrations, so a login does not scan the tables.
+    """
+    matches = []
+    for role, filename in ACCOUNT_TABLES:
+        table = _sqlite_table(filename)
+        if table:
+            rows = sqlite_backend.select_by_username(table, username, ignore_case)
+        else:
+            rows = _table_index(filename, UsernameIndex).accounts(username, ignore_case)
+        matches.extend((role, dict(row)) for row in rows)
+    return matches
+
+def join_registrations(registrations, with_patients=True):
+    """Yield registrations joined with their schedule, doctor and patient.
+    
+    The schedule, doctor and patient tables are each read once into a hash
+    table by id, then every registration is resolved with dictionary lookups
+    instead of one table read per row. Each yielded row is a copy of the
+    registration with 'jadwal' and 'dokter' (the matching rows, or None) and
+    the display strings 'nama_dokter', 'detail_jadwal' and, unless
+    with_patients is False, 'nama_pasien'.
+    """
+    schedules = {row['id']: row for row in iter_csv("data/jadwal_dokter.csv")}
+    doctors = {row['id']: row for row in iter_csv("data/dokter.csv")}
+    patients = {row['id']: row['nama'] for row in iter_csv("data/pasien.csv")} if with_patients else {}
+    
+    for registration in registrations:
+        row = dict(registration)
+        schedule = schedules.get(row.get('jadwal_id'))
+        doctor = doctors.get(schedule['dokter_id']) if schedule else None
+        row['jadwal'] = schedule
+        row['dokter'] = doctor
+        row['nama_dokter'] = doctor['nama'] if doctor else "Unknown Doctor"
+        if schedule:
+            row['detail_jadwal'] = f"{row['nama_dokter']} - {schedule['hari']} {schedule['jam_mulai']}-{schedule['jam_selesai']}"
+        else:
+            row['detail_jadwal'] = "Unknown Schedule"
+        if with_patients:
+            row['nama_pasien'] = patients.get(row.get('pasien_id'), "Unknown Patient")
+        yield row
+
+def search_doctors(column, text, limit=5):
+    """Find doctors by part of their 'nama' or 'spesialisasi', tolerating typos.
+    
+    Returns (doctors, fuzzy): the doctors whose column contains text, with
+    fuzzy False, or when there are none, up to limit doctors with the most
+    similar value (best first), with fuzzy True. Served from a trigram index
+    over dokter.csv that follows changes to the table.
+    """
+    index = _table_index("data/dokter.csv", TrigramIndex)
+    doctors = index.search(column, text)
+    if doctors:
+        return [dict(row) for row in doctors], False
+    return [dict(row) for _, row in index.similar(column, text, limit=limit)], True
+
+def schedules_on_day(hari):
+    """Return the schedules on one day of the week, earliest jam_mulai first."""
+    return [dict(row) for row in _table_index("data/jadwal_dokter.csv", ScheduleIndex).on_day(hari)]
+
+def _minutes_range(start_time, end_time):
+    start, end = to_minutes(start_time), to_minutes(end_time)
+    if start >= end:
+        raise ValueError("%s-%s" % (start_time, end_time))
+    return start, end
+
+def schedules_overlapping(hari, start_time, end_time):
+    """Return the schedules of all doctors on hari overlapping start_time-end_time ("HH:MM").
+    
+    Answered by the interval tree of that day. Raises ValueError like
+    schedule_conflicts.
+    """
+    start, end = _minutes_range(start_time, end_time)
+    index = _table_index("data/jadwal_dokter.csv", ScheduleIndex)
+    return [dict(row) for row in index.overlapping(hari, start, end)]
+
+def schedule_conflicts(doctor_id, hari, start_time, end_time, exclude_id=None):
+    """Return the doctor's schedules on hari overlapping start_time-end_time ("HH:MM").
+    
+    Answered by the doctor's interval tree for that day; exclude_id skips
+    the schedule being edited. Raises ValueError for a malformed time or
+    a start that is not before the end.
+    """
+    start, end = _minutes_range(start_time, end_time)
+    index = _table_index("data/jadwal_dokter.csv", ScheduleIndex)
+    return [dict(row) for row in index.conflicts(doctor_id, hari, start, end) if row['id'] != exclude_id]
 
 def get_doctor_name(doctor_id):
     """Get doctor name from doctor ID."""
-    doctors = read_csv("data/dokter.csv")
-    for doctor in doctors:
-        if doctor['id'] == doctor_id:
-            return doctor['nama']
+    doctors = find_rows("data/dokter.csv", id=doctor_id)
+    if doctors:
+        return doctors[0]['nama']
     return "Unknown Doctor"
 
 def get_patient_name(patient_id):
     """Get patient name from patient ID."""
-    patients = read_csv("data/pasien.csv")
-    for patient in patients:
-        if patient['id'] == patient_id:
-            return patient['nama']
+    patients = find_rows("data/pasien.csv", id=patient_id)
+    if patients:
+        return patients[0]['nama']
     return "Unknown Patient"
 
 def get_schedule_details(schedule_id):
     """Get schedule details from schedule ID."""
-    schedules = read_csv("data/jadwal_dokter.csv")
-    for schedule in schedules:
-        if schedule['id'] == schedule_id:
-            doctor_name = get_doctor_name(schedule['dokter_id'])
-            return f"{doctor_name} - {schedule['hari']} {schedule['jam_mulai']}-{schedule['jam_selesai']}"
+    schedules = find_rows("data/jadwal_dokter.csv", id=schedule_id)
+    if schedules:
+        schedule = schedules[0]
+        doctor_name = get_doctor_name(schedule['dokter_id'])
+        return f"{doctor_name} - {schedule['hari']} {schedule['jam_mulai']}-{schedule['jam_selesai']}"
     return "Unknown Schedule"
\ No newline at end of file
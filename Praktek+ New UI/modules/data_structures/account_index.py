@@ -0,0 +1,25 @@
+# modules/data_structures/account_index.py
+from .row_index import RowIndex
+
+class UsernameIndex(RowIndex):
+    """Rows of an account table by username, matched exactly or ignoring case."""
+    
+    def __init__(self, rows=()):
+        self._usernames = {}  # lower-cased username -> {id -> row}
+        super().__init__(rows)
+    
+    def _add(self, row):
+        self._usernames.setdefault((row.get('username') or '').lower(), {})[row['id']] = row
+    
+    def _remove(self, row):
+        key = (row.get('username') or '').lower()
+        accounts = self._usernames.get(key)
+        if accounts and accounts.pop(row['id'], None) is not None and not accounts:
+            del self._usernames[key]
+    
+    def accounts(self, username, ignore_case=False):
+        """Return the rows with this username (in table order)."""
+        rows = self._usernames.get(username.lower(), {}).values()
+        if ignore_case:
+            return list(rows)
+        return [row for row in rows if row.get('username') == username]
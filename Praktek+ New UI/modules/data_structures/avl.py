@@ -0,0 +1,42 @@
+# modules/data_structures/avl.py
+# Rebalancing helpers shared by the AVL trees in this package. Nodes need
+# left, right and height attributes; trees that keep more per-node data
+# (like the interval tree's max_end) pass their own update function, which
+# must also call update_height.
+
+def height(node):
+    return node.height if node else 0
+
+def update_height(node):
+    left, right = height(node.left), height(node.right)
+    node.height = (left if left > right else right) + 1
+
+def rotate_left(node, update=update_height):
+    pivot = node.right
+    node.right = pivot.left
+    pivot.left = node
+    update(node)
+    update(pivot)
+    return pivot
+
+def rotate_right(node, update=update_height):
+    pivot = node.left
+    node.left = pivot.right
+    pivot.right = node
+    update(node)
+    update(pivot)
+    return pivot
+
+def balance(node, update=update_height):
+    """Restore the AVL property at node; returns the root of the subtree."""
+    update(node)
+    skew = height(node.left) - height(node.right)
+    if skew > 1:
+        if height(node.left.left) < height(node.left.right):
+            node.left = rotate_left(node.left, update)
+        return rotate_right(node, update)
+    if skew < -1:
+        if height(node.right.right) < height(node.right.left):
+            node.right = rotate_right(node.right, update)
+        return rotate_left(node, update)
+    return node
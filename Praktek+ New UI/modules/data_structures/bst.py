@@ -1,47 +1,159 @@
 # modules/data_structures/bst.py
+from .avl import balance, update_height
+
 class TreeNode:
+    __slots__ = ('key', 'value', 'left', 'right', 'height')
+    
     def __init__(self, key, value):
         self.key = key
         self.value = value
         self.left = None
         self.right = None
+        self.height = 1
 
 class BST:
+    """AVL-balanced binary search tree; equal keys are kept, in insertion order.
+    
+    Every operation walks down the tree in a loop and rebalances the
+    visited path on the way back, so sorted input stays O(log n) deep and
+    never hits the recursion limit.
+    """
+    
     def __init__(self):
         self.root = None
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    def __contains__(self, key):
+        return self._find(key) is not None
+    
+    @classmethod
+    def from_sorted(cls, pairs):
+        """Build a balanced tree in O(n) from (key, value) pairs sorted by key."""
+        pairs = list(pairs)
+        for (previous, _), (key, _) in zip(pairs, pairs[1:]):
+            if key < previous:
+                raise ValueError("Kunci tidak terurut: %r setelah %r" % (key, previous))
+        tree = cls()
+        tree.root = tree._build(pairs, 0, len(pairs))
+        tree._size = len(pairs)
+        return tree
+    
+    def _build(self, pairs, low, high):
+        # Recursion depth is log2(n)
+        if low >= high:
+            return None
+        middle = (low + high) // 2
+        node = TreeNode(*pairs[middle])
+        node.left = self._build(pairs, low, middle)
+        node.right = self._build(pairs, middle + 1, high)
+        update_height(node)
+        return node
+    
+    def _relink(self, parent, old, new):
+        if parent is None:
+            self.root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+    
+    def _rebalance(self, path):
+        """Rebalance the nodes of a root-to-leaf path, deepest first."""
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            balanced = balance(node)
+            if balanced is not node:
+                self._relink(path[i - 1] if i else None, node, balanced)
     
     def insert(self, key, value):
-        self.root = self._insert_recursive(self.root, key, value)
+        path = []
+        node = self.root
+        while node:
+            path.append(node)
+            node = node.left if key < node.key else node.right
+        new = TreeNode(key, value)
+        if not path:
+            self.root = new
+        elif key < path[-1].key:
+            path[-1].left = new
+        else:
+            path[-1].right = new
+        self._size += 1
+        self._rebalance(path)
+    
+    def _find(self, key):
+        node = self.root
+        while node:
+            if key < node.key:
+                node = node.left
+            elif node.key < key:
+                node = node.right
+            else:
+                return node
+        return None
+    
+    def search(self, key):
+        node = self._find(key)
+        return node.value if node else None
     
-    def _insert_recursive(self, node, key, value):
+    def delete(self, key):
+        """Remove one entry with the given key; returns False if there is none."""
+        path = []
+        node = self.root
+        while node and node.key != key:
+            path.append(node)
+            node = node.left if key < node.key else node.right
         if node is None:
-            return TreeNode(key, value)
+            return False
         
-        if key < node.key:
-            node.left = self._insert_recursive(node.left, key, value)
-        else:
-            node.right = self._insert_recursive(node.right, key, value)
+        if node.left and node.right:
+            # Take over the successor's entry, then unlink the successor instead
+            path.append(node)
+            successor = node.right
+            while successor.left:
+                path.append(successor)
+                successor = successor.left
+            node.key, node.value = successor.key, successor.value
+            node = successor
         
-        return node
+        self._relink(path[-1] if path else None, node, node.left or node.right)
+        self._size -= 1
+        self._rebalance(path)
+        return True
     
-    def search(self, key):
-        return self._search_recursive(self.root, key)
+    def ceiling(self, key):
+        """Return the (key, value) with the smallest key >= key, or None."""
+        best = None
+        node = self.root
+        while node:
+            if node.key < key:
+                node = node.right
+            else:
+                best = node
+                node = node.left
+        return (best.key, best.value) if best else None
     
-    def _search_recursive(self, node, key):
-        if node is None or node.key == key:
-            return node.value if node else None
-        
-        if key < node.key:
-            return self._search_recursive(node.left, key)
-        return self._search_recursive(node.right, key)
+    def items(self, lo=None, hi=None):
+        """Yield (key, value) pairs in key order, limited to lo <= key <= hi when given."""
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                if lo is not None and node.key < lo:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if hi is not None and hi < node.key:
+                return
+            yield node.key, node.value
+            node = node.right
     
     def inorder_traversal(self):
-        result = []
-        self._inorder_recursive(self.root, result)
-        return result
-    
-    def _inorder_recursive(self, node, result):
-        if node:
-            self._inorder_recursive(node.left, result)
-            result.append((node.key, node.value))
-            self._inorder_recursive(node.right, result)
\ No newline at end of file
+        return list(self.items())
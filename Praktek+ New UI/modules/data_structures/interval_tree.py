@@ -0,0 +1,100 @@
+# modules/data_structures/interval_tree.py
+from .avl import balance, update_height
+
+class IntervalNode:
+    __slots__ = ('start', 'end', 'key', 'max_end', 'height', 'left', 'right')
+    
+    def __init__(self, start, end, key):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.max_end = end
+        self.height = 1
+        self.left = None
+        self.right = None
+
+def _update(node):
+    """Node update for the AVL helpers: height and the largest end in the subtree."""
+    update_height(node)
+    node.max_end = node.end
+    if node.left and node.left.max_end > node.max_end:
+        node.max_end = node.left.max_end
+    if node.right and node.right.max_end > node.max_end:
+        node.max_end = node.right.max_end
+
+class IntervalTree:
+    """Half-open intervals [start, end) with a unique key each, for overlap queries.
+    
+    An AVL tree ordered by (start, end, key) where every node also holds the
+    largest end in its subtree, so subtrees that end before a query starts
+    are skipped and all k overlaps are found in O(log n + k) steps for the
+    short, sparse lists of a schedule.
+    """
+    
+    def __init__(self):
+        self.root = None
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    def insert(self, start, end, key):
+        self.root = self._insert(self.root, IntervalNode(start, end, key))
+        self._size += 1
+    
+    def _insert(self, node, new):
+        if node is None:
+            return new
+        if (new.start, new.end, new.key) < (node.start, node.end, node.key):
+            node.left = self._insert(node.left, new)
+        else:
+            node.right = self._insert(node.right, new)
+        return balance(node, _update)
+    
+    def remove(self, start, end, key):
+        """Remove one interval; returns False if it is not in the tree."""
+        size = self._size
+        self.root = self._remove(self.root, (start, end, key))
+        return self._size < size
+    
+    def _remove(self, node, target):
+        if node is None:
+            return None
+        current = (node.start, node.end, node.key)
+        if target < current:
+            node.left = self._remove(node.left, target)
+        elif target > current:
+            node.right = self._remove(node.right, target)
+        else:
+            self._size -= 1
+            if node.left is None or node.right is None:
+                return node.left or node.right
+            # Replace with the smallest interval of the right subtree
+            successor = node.right
+            while successor.left:
+                successor = successor.left
+            node.right = self._remove_min(node.right)
+            successor.left, successor.right = node.left, node.right
+            node = successor
+        return balance(node, _update)
+    
+    def _remove_min(self, node):
+        if node.left is None:
+            return node.right
+        node.left = self._remove_min(node.left)
+        return balance(node, _update)
+    
+    def overlapping(self, start, end):
+        """Return the keys of the intervals overlapping [start, end), earliest start first."""
+        result = []
+        self._collect(self.root, start, end, result)
+        return result
+    
+    def _collect(self, node, start, end, result):
+        if node is None or node.max_end <= start:
+            return
+        self._collect(node.left, start, end, result)
+        if node.start < end:
+            if node.end > start:
+                result.append(node.key)
+            self._collect(node.right, start, end, result)
@@ -1,42 +1,100 @@
 # modules/data_structures/linked_list.py
 class Node:
+    __slots__ = ('data', 'next', 'prev', 'owner')
+    
     def __init__(self, data):
         self.data = data
         self.next = None
+        self.prev = None   # only maintained by doubly linked lists
+        self.owner = None  # the list this node is in, None once removed
 
 class LinkedList:
-    def __init__(self):
+    """Linked list with head and tail pointers and a maintained length.
+    
+    append and prepend return the new node, a handle for remove_node. With
+    doubly=True the nodes also link back, which makes remove_node O(1)
+    instead of a walk from the head.
+    """
+    
+    def __init__(self, items=(), doubly=False):
         self.head = None
+        self.tail = None
+        self.doubly = doubly
+        self._length = 0
+        for item in items:
+            self.append(item)
+    
+    def __len__(self):
+        return self._length
+    
+    def __iter__(self):
+        current = self.head
+        while current:
+            following = current.next  # so the current node may be removed meanwhile
+            yield current.data
+            current = following
     
     def is_empty(self):
         return self.head is None
     
     def append(self, data):
         new_node = Node(data)
+        new_node.owner = self
         if self.is_empty():
-            self.head = new_node
-            return
-        
-        current = self.head
-        while current.next:
-            current = current.next
-        current.next = new_node
+            self.head = self.tail = new_node
+        else:
+            if self.doubly:
+                new_node.prev = self.tail
+            self.tail.next = new_node
+            self.tail = new_node
+        self._length += 1
+        return new_node
     
     def prepend(self, data):
         new_node = Node(data)
+        new_node.owner = self
         new_node.next = self.head
+        if self.doubly and self.head:
+            self.head.prev = new_node
         self.head = new_node
+        if self.tail is None:
+            self.tail = new_node
+        self._length += 1
+        return new_node
     
-    def delete(self, key):
-        current = self.head
-        
-        # If head node itself holds the key
-        if current and current.data == key:
-            self.head = current.next
-            return True
+    def _unlink(self, prev, node):
+        """Unlink node, whose predecessor is prev (None for the head)."""
+        if prev is None:
+            self.head = node.next
+        else:
+            prev.next = node.next
+        if node.next is None:
+            self.tail = prev
+        elif self.doubly:
+            node.next.prev = prev
+        node.next = node.prev = node.owner = None
+        self._length -= 1
+    
+    def remove_node(self, node):
+        """Remove a node returned by append/prepend; O(1) in a doubly linked list.
         
-        # Search for the key and delete
+        Raises ValueError if the node is not in this list.
+        """
+        if node.owner is not self:
+            raise ValueError("Node bukan bagian dari list ini")
+        if self.doubly:
+            prev = node.prev
+        else:
+            prev = None
+            current = self.head
+            while current is not node:
+                prev, current = current, current.next
+        self._unlink(prev, node)
+    
+    def delete(self, key):
+        """Remove the first element equal to key; returns False if there is none."""
         prev = None
+        current = self.head
         while current and current.data != key:
             prev = current
             current = current.next
@@ -44,7 +102,7 @@ class LinkedList:
         if current is None:
             return False
         
-        prev.next = current.next
+        self._unlink(prev, current)
         return True
     
     def search(self, key):
@@ -56,9 +114,4 @@ class LinkedList:
         return None
     
     def display(self):
-        elements = []
-        current = self.head
-        while current:
-            elements.append(current.data)
-            current = current.next
-        return elements
\ No newline at end of file
+        return list(self)
@@ -1,26 +1,119 @@
 # modules/data_structures/queue.py
+import threading
+import time
+from collections import deque
+
 class Queue:
-    def __init__(self):
-        self.items = []
+    """FIFO queue on a deque, optionally bounded to maxlen items.
+    
+    Every operation holds the queue's lock, so one queue can be shared by
+    threads; enqueue_wait and dequeue_wait block until there is room or an
+    item. A full queue refuses new items instead of dropping old ones.
+    """
+    
+    def __init__(self, maxlen=None):
+        self.maxlen = maxlen
+        self._items = deque()
+        self._changed = threading.Condition(threading.RLock())
+    
+    @property
+    def items(self):
+        """A copy of the queued items, front first."""
+        with self._changed:
+            return list(self._items)
+    
+    def __len__(self):
+        return len(self._items)
+    
+    def __iter__(self):
+        # Iterates the deque itself; changing the queue meanwhile raises RuntimeError
+        return iter(self._items)
     
     def is_empty(self):
-        return len(self.items) == 0
+        return len(self._items) == 0
+    
+    def is_full(self):
+        return self.maxlen is not None and len(self._items) >= self.maxlen
     
     def enqueue(self, item):
-        self.items.append(item)
+        """Add an item at the back; returns False if the queue is full."""
+        with self._changed:
+            if self.is_full():
+                return False
+            self._items.append(item)
+            self._changed.notify_all()
+            return True
+    
+    def enqueue_many(self, items):
+        """Add items in order until the queue is full; returns how many were added."""
+        added = 0
+        with self._changed:
+            for item in items:
+                if self.is_full():
+                    break
+                self._items.append(item)
+                added += 1
+            if added:
+                self._changed.notify_all()
+        return added
     
     def dequeue(self):
-        if not self.is_empty():
-            return self.items.pop(0)
-        return None
+        with self._changed:
+            if not self.is_empty():
+                item = self._items.popleft()
+                self._changed.notify_all()
+                return item
+            return None
+    
+    def dequeue_many(self, count):
+        """Remove and return up to count items from the front."""
+        with self._changed:
+            taken = [self._items.popleft() for _ in range(min(count, len(self._items)))]
+            if taken:
+                self._changed.notify_all()
+            return taken
+    
+    def _wait_for(self, ready, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not ready():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            self._changed.wait(remaining)
+        return True
+    
+    def enqueue_wait(self, item, timeout=None):
+        """Add an item, waiting up to timeout seconds for room; returns False on timeout."""
+        with self._changed:
+            if not self._wait_for(lambda: not self.is_full(), timeout):
+                return False
+            return self.enqueue(item)
+    
+    def dequeue_wait(self, timeout=None):
+        """Remove the front item, waiting up to timeout seconds for one; None on timeout."""
+        with self._changed:
+            if not self._wait_for(lambda: not self.is_empty(), timeout):
+                return None
+            return self.dequeue()
+    
+    def remove(self, item):
+        """Remove the first occurrence of item; returns False if it is not queued."""
+        with self._changed:
+            try:
+                self._items.remove(item)
+            except ValueError:
+                return False
+            self._changed.notify_all()
+            return True
     
     def peek(self):
-        if not self.is_empty():
-            return self.items[0]
-        return None
+        with self._changed:
+            if not self.is_empty():
+                return self._items[0]
+            return None
     
     def size(self):
-        return len(self.items)
+        return len(self._items)
     
     def display(self):
-        return self.items
\ No newline at end of file
+        return self.items
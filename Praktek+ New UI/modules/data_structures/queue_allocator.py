@@ -0,0 +1,32 @@
+# modules/data_structures/queue_allocator.py
+import heapq
+
+class QueueNumberAllocator:
+    """Free queue numbers 1..quota of one schedule on one date, lowest first.
+    
+    A bitmap marks the numbers in use and a min-heap holds the free ones,
+    so take is O(log quota).
+    """
+    
+    def __init__(self, quota, taken=()):
+        self.quota = quota
+        self._used = bytearray(quota + 1)  # _used[n] is 1 while number n is taken
+        for number in taken:
+            if 1 <= number <= quota:
+                self._used[number] = 1
+        # Built in ascending order, so already a valid heap
+        self._free = [number for number in range(1, quota + 1) if not self._used[number]]
+    
+    @classmethod
+    def from_registrations(cls, quota, registrations):
+        """Build from the active registrations of the slot in a single pass."""
+        return cls(quota, (int(reg['nomor_antrian']) for reg in registrations
+                           if (reg.get('nomor_antrian') or '').isdigit()))
+    
+    def take(self):
+        """Take the lowest free number; returns None when all are taken."""
+        if not self._free:
+            return None
+        number = heapq.heappop(self._free)
+        self._used[number] = 1
+        return number
@@ -0,0 +1,76 @@
+# modules/data_structures/registration_index.py
+from bisect import bisect_left, insort
+from .row_index import RowIndex
+
+CANCELLED = 'Dibatalkan'
+
+class SlotIndex(RowIndex):
+    """Active (not cancelled) registrations by jadwal_id and tanggal, with live counts."""
+    
+    def __init__(self, rows=()):
+        self._slots = {}   # jadwal_id -> {tanggal -> {id -> row}}
+        self._counts = {}  # jadwal_id -> number of active registrations
+        super().__init__(rows)
+    
+    def _add(self, row):
+        if row.get('status') == CANCELLED:
+            return
+        schedule_id = row.get('jadwal_id')
+        dates = self._slots.setdefault(schedule_id, {})
+        dates.setdefault(row.get('tanggal'), {})[row['id']] = row
+        self._counts[schedule_id] = self._counts.get(schedule_id, 0) + 1
+    
+    def _remove(self, row):
+        schedule_id = row.get('jadwal_id')
+        dates = self._slots.get(schedule_id)
+        slot = dates.get(row.get('tanggal')) if dates else None
+        if not slot or slot.pop(row['id'], None) is None:
+            return
+        if not slot:
+            del dates[row.get('tanggal')]
+            if not dates:
+                del self._slots[schedule_id]
+        self._counts[schedule_id] -= 1
+        if not self._counts[schedule_id]:
+            del self._counts[schedule_id]
+    
+    def registrations(self, schedule_id, tanggal=None):
+        """Return the active registrations of a schedule, on one date or on all dates."""
+        dates = self._slots.get(schedule_id, {})
+        if tanggal is not None:
+            return list(dates.get(tanggal, {}).values())
+        return [row for day in sorted(dates, key=lambda day: day or '') for row in dates[day].values()]
+    
+    def count(self, schedule_id, tanggal=None):
+        """Return the number of active registrations of a schedule, optionally on one date."""
+        if tanggal is not None:
+            return len(self._slots.get(schedule_id, {}).get(tanggal, ()))
+        return self._counts.get(schedule_id, 0)
+    
+    def counts(self):
+        """Return {jadwal_id: number of active registrations} over all dates."""
+        return dict(self._counts)
+
+class PatientIndex(RowIndex):
+    """Every registration of each patient, kept sorted by tanggal."""
+    
+    def __init__(self, rows=()):
+        self._patients = {}  # pasien_id -> sorted [(tanggal, id)]
+        super().__init__(rows)
+    
+    def _add(self, row):
+        insort(self._patients.setdefault(row.get('pasien_id'), []), (row.get('tanggal') or '', row['id']))
+    
+    def _remove(self, row):
+        patient_id = row.get('pasien_id')
+        keys = self._patients.get(patient_id)
+        key = (row.get('tanggal') or '', row['id'])
+        position = bisect_left(keys, key) if keys else 0
+        if keys and position < len(keys) and keys[position] == key:
+            del keys[position]
+            if not keys:
+                del self._patients[patient_id]
+    
+    def registrations(self, patient_id):
+        """Return the registrations of one patient, oldest tanggal first."""
+        return [self._rows[row_id] for _, row_id in self._patients.get(patient_id, ())]
@@ -0,0 +1,242 @@
+# modules/data_structures/registration_table.py
+from array import array
+from collections.abc import Mapping
+from datetime import date
+from itertools import islice
+
+COLUMNS = ['id', 'pasien_id', 'jadwal_id', 'tanggal', 'status', 'nomor_antrian']
+
+class CategoricalColumn:
+    """Column of repeated strings stored as integer codes into a list of categories."""
+    
+    def __init__(self):
+        self.codes = array('i')
+        self.categories = []
+        self.lookup = {}
+    
+    def code_for(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(value)
+            self.lookup[value] = code
+        return code
+    
+    def extend(self, values):
+        lookup = self.lookup
+        self.codes.extend([lookup[value] if value in lookup else self.code_for(value) for value in values])
+    
+    def get(self, index):
+        return self.categories[self.codes[index]]
+    
+    def set(self, index, value):
+        self.codes[index] = self.code_for(value)
+
+class IntColumn:
+    """Column of strings that are usually integers, stored in an array('i').
+    
+    Values the encoder cannot turn into an int exactly are kept verbatim in a
+    small side table, so every value round-trips unchanged.
+    """
+    RAW = -2**31
+    
+    def __init__(self, encode, decode):
+        self.values = array('i')
+        self.raw = {}
+        self.encode = encode
+        self.decode = decode
+        self.memo = {}
+    
+    def encoded(self, value):
+        encoded = self.memo.get(value)
+        if encoded is None:
+            try:
+                encoded = self.encode(value)
+            except (ValueError, OverflowError):
+                encoded = None
+            if encoded is None or not self.RAW < encoded < 2**31 or self.decode(encoded) != value:
+                encoded = self.RAW
+            self.memo[value] = encoded
+        return encoded
+    
+    def extend(self, values):
+        start = len(self.values)
+        memo = self.memo
+        encoded = [memo[value] if value in memo else self.encoded(value) for value in values]
+        self.values.extend(encoded)
+        if self.RAW in memo.values():
+            for offset, value in enumerate(values):
+                if encoded[offset] == self.RAW:
+                    self.raw[start + offset] = value
+    
+    def get(self, index):
+        value = self.values[index]
+        if value == self.RAW:
+            return self.raw[index]
+        return self.decode(value)
+    
+    def set(self, index, value):
+        encoded = self.encoded(value)
+        self.values[index] = encoded
+        if encoded == self.RAW:
+            self.raw[index] = value
+        else:
+            self.raw.pop(index, None)
+
+def _encode_queue(value):
+    return int(value) if value.isdigit() else None
+
+def _encode_date(value):
+    return date.fromisoformat(value).toordinal()
+
+def _decode_date(ordinal):
+    return date.fromordinal(ordinal).isoformat()
+
+class IdColumn:
+    """Column of ids such as R001, stored as a shared prefix plus an array('i') of numbers."""
+    
+    def __init__(self):
+        self.prefix = None
+        self.width = 0
+        self.numbers = array('i')
+        self.strings = None  # Used instead once an id does not fit the pattern
+    
+    def extend(self, values):
+        if self.strings is None and self.prefix is None and values:
+            number = values[0].lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+            self.prefix, self.width = values[0][:len(values[0]) - len(number)], len(number)
+        
+        if self.strings is None:
+            prefix, width = self.prefix, self.width
+            try:
+                numbers = [int(value[len(prefix):]) for value in values]
+            except ValueError:
+                numbers = None
+            if numbers is not None and all(
+                    f"{prefix}{number:0{width}d}" == value and 0 <= number < 2**31
+                    for number, value in zip(numbers, values)):
+                self.numbers.extend(numbers)
+                return
+            self.strings = [self.get(i) for i in range(len(self.numbers))]
+            self.numbers = array('i')
+        self.strings.extend(values)
+    
+    def get(self, index):
+        if self.strings is not None:
+            return self.strings[index]
+        return f"{self.prefix}{self.numbers[index]:0{self.width}d}"
+
+class RegistrationRow(Mapping):
+    """Read-only dictionary view of one registration inside a RegistrationTable."""
+    __slots__ = ('_table', '_index')
+    
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+    
+    def __getitem__(self, column):
+        return self._table.get(self._index, column)
+    
+    def __iter__(self):
+        return iter(COLUMNS)
+    
+    def __len__(self):
+        return len(COLUMNS)
+    
+    def __repr__(self):
+        return repr(dict(self))
+
+class RegistrationTable:
+    """Compact column-oriented store for the pendaftaran table.
+    
+    pasien_id, jadwal_id and status are categorical, tanggal is kept as a date
+    ordinal and nomor_antrian as an int, so a row costs a few machine words
+    instead of a dictionary of six strings.
+    """
+    
+    def __init__(self):
+        self.columns = {
+            'id': IdColumn(),
+            'pasien_id': CategoricalColumn(),
+            'jadwal_id': CategoricalColumn(),
+            'tanggal': IntColumn(_encode_date, _decode_date),
+            'status': CategoricalColumn(),
+            'nomor_antrian': IntColumn(_encode_queue, str),
+        }
+        self.size = 0
+    
+    @classmethod
+    def from_rows(cls, rows, chunk_size=4096):
+        """Build a table from dictionaries or from tuples in COLUMNS order."""
+        table = cls()
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return table
+            table.extend(chunk)
+    
+    def extend(self, rows):
+        """Append many rows at once, column by column."""
+        rows = [
+            [row.get(column, '') for column in COLUMNS] if isinstance(row, Mapping) else row
+            for row in rows
+        ]
+        if not rows:
+            return
+        for column, values in zip(COLUMNS, zip(*rows)):
+            self.columns[column].extend(list(values))
+        self.size += len(rows)
+    
+    def append(self, row):
+        self.extend([row])
+    
+    def get(self, index, column):
+        if column not in self.columns:
+            raise KeyError(column)
+        return self.columns[column].get(index)
+    
+    def update(self, index, changes):
+        for column, value in changes.items():
+            if column != 'id':
+                self.columns[column].set(index, value)
+    
+    def row(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return RegistrationRow(self, index)
+    
+    def __len__(self):
+        return self.size
+    
+    def __getitem__(self, index):
+        return self.row(index)
+    
+    def __iter__(self):
+        for index in range(self.size):
+            yield RegistrationRow(self, index)
+    
+    def count(self, **where):
+        """Count rows whose categorical columns equal the given values."""
+        return sum(1 for _ in self.indices(**where))
+    
+    def indices(self, **where):
+        """Yield the positions of rows whose categorical columns equal the given values."""
+        codes = []
+        for column, value in where.items():
+            category = self.columns[column]
+            if not isinstance(category, CategoricalColumn):
+                raise KeyError(column)
+            if value not in category.lookup:
+                return
+            codes.append((category.codes, category.lookup[value]))
+        
+        if len(codes) == 1:
+            column, code = codes[0]
+            yield from (index for index, value in enumerate(column) if value == code)
+            return
+        for index in range(self.size):
+            if all(column[index] == code for column, code in codes):
+                yield index
@@ -0,0 +1,41 @@
+# modules/data_structures/row_index.py
+class RowIndex:
+    """Base for indexes over table rows that follow row-level changes.
+    
+    Subclasses decide where a row is filed (_add) and how it is taken out
+    again (_remove). Changes use the same entries as the table journal, so an
+    index can be kept current without being rebuilt from the whole table.
+    """
+    
+    def __init__(self, rows=()):
+        self._rows = {}
+        for row in rows:
+            self._rows[row['id']] = row
+            self._add(row)
+    
+    def _add(self, row):
+        raise NotImplementedError
+    
+    def _remove(self, row):
+        raise NotImplementedError
+    
+    def apply(self, entry):
+        """Apply one insert/update/delete entry ({'op', 'id', 'row' or 'changes'})."""
+        op = entry.get('op')
+        row_id = entry.get('id')
+        old = self._rows.pop(row_id, None)
+        if old is not None:
+            self._remove(old)
+        
+        if op == 'insert':
+            row = dict(entry['row'])
+        elif op == 'update' and old is not None:
+            row = dict(old)
+            row.update({k: v for k, v in entry['changes'].items() if k in row})
+        else:
+            return
+        self._rows[row_id] = row
+        self._add(row)
+    
+    def __len__(self):
+        return len(self._rows)
@@ -0,0 +1,79 @@
+# modules/data_structures/schedule_index.py
+from bisect import bisect_left, insort
+from .interval_tree import IntervalTree
+from .row_index import RowIndex
+
+def to_minutes(value):
+    """Parse "HH:MM" into minutes after midnight; raises ValueError for anything else."""
+    hour, minute = map(int, value.split(':'))
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(value)
+    return hour * 60 + minute
+
+class ScheduleIndex(RowIndex):
+    """Schedules bucketed by hari, each bucket sorted by jam_mulai in minutes.
+    
+    Each day's schedules, and each doctor's schedules on each day, are also
+    kept in interval trees for overlap queries. Schedules whose times
+    cannot be parsed are only listed by on_day.
+    """
+    
+    def __init__(self, rows=()):
+        self._days = {}       # hari -> sorted [(start, end, id)]
+        self._day_trees = {}  # hari -> IntervalTree of ids
+        self._trees = {}      # (dokter_id, hari) -> IntervalTree of ids
+        self._unparsed = {}   # hari -> {id: row}
+        super().__init__(rows)
+    
+    def _times(self, row):
+        try:
+            return to_minutes(row.get('jam_mulai') or ''), to_minutes(row.get('jam_selesai') or '')
+        except ValueError:
+            return None
+    
+    def _add(self, row):
+        day = row.get('hari')
+        times = self._times(row)
+        if times is None:
+            self._unparsed.setdefault(day, {})[row['id']] = row
+            return
+        start, end = times
+        insort(self._days.setdefault(day, []), (start, end, row['id']))
+        self._day_trees.setdefault(day, IntervalTree()).insert(start, end, row['id'])
+        tree = self._trees.setdefault((row.get('dokter_id'), day), IntervalTree())
+        tree.insert(start, end, row['id'])
+    
+    def _remove(self, row):
+        day = row.get('hari')
+        times = self._times(row)
+        if times is None:
+            self._unparsed.get(day, {}).pop(row['id'], None)
+            return
+        bucket = self._days.get(day, [])
+        key = (times[0], times[1], row['id'])
+        position = bisect_left(bucket, key)
+        if position < len(bucket) and bucket[position] == key:
+            del bucket[position]
+        for trees, tree_key in ((self._day_trees, day), (self._trees, (row.get('dokter_id'), day))):
+            tree = trees.get(tree_key)
+            if tree is not None and tree.remove(times[0], times[1], row['id']) and not len(tree):
+                del trees[tree_key]
+    
+    def on_day(self, day):
+        """Return the schedules on one day, earliest jam_mulai first."""
+        rows = [self._rows[row_id] for _, _, row_id in self._days.get(day, [])]
+        return rows + list(self._unparsed.get(day, {}).values())
+    
+    def overlapping(self, day, start, end):
+        """Return every schedule on a day that overlaps [start, end) in minutes, earliest first."""
+        tree = self._day_trees.get(day)
+        if tree is None:
+            return []
+        return [self._rows[row_id] for row_id in tree.overlapping(start, end)]
+    
+    def conflicts(self, doctor_id, day, start, end):
+        """Return the doctor's schedules on a day that overlap [start, end) in minutes, earliest first."""
+        tree = self._trees.get((doctor_id, day))
+        if tree is None:
+            return []
+        return [self._rows[row_id] for row_id in tree.overlapping(start, end)]
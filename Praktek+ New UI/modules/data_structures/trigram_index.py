@@ -0,0 +1,89 @@
+# modules/data_structures/trigram_index.py
+from .row_index import RowIndex
+
+def trigrams(text):
+    """Return the trigrams of a lower-cased text and of each of its words, padded with spaces."""
+    text = text.lower()
+    grams = set()
+    for part in [text] + text.split():
+        padded = "  " + part + " "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def _word_trigrams(word):
+    padded = "  " + word + " "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def similarity(query, text):
+    """Trigram similarity (0..1) of a query to a text or to its closest word."""
+    query_grams = _word_trigrams(query.lower())
+    best = 0.0
+    for part in [text.lower()] + text.lower().split():
+        grams = _word_trigrams(part)
+        score = len(query_grams & grams) / len(query_grams | grams)
+        if score > best:
+            best = score
+    return best
+
+class TrigramIndex(RowIndex):
+    """Trigram posting lists over some text columns, for substring and fuzzy search."""
+    
+    def __init__(self, rows=(), columns=('nama', 'spesialisasi')):
+        self.columns = columns
+        self._postings = {column: {} for column in columns}  # column -> trigram -> {id}
+        super().__init__(rows)
+    
+    def _add(self, row):
+        for column in self.columns:
+            postings = self._postings[column]
+            for gram in trigrams(row.get(column) or ''):
+                postings.setdefault(gram, set()).add(row['id'])
+    
+    def _remove(self, row):
+        for column in self.columns:
+            postings = self._postings[column]
+            for gram in trigrams(row.get(column) or ''):
+                ids = postings.get(gram)
+                if ids is not None:
+                    ids.discard(row['id'])
+                    if not ids:
+                        del postings[gram]
+    
+    def _ordered(self, ids):
+        return [self._rows[row_id] for row_id in sorted(ids)]
+    
+    def search(self, column, text):
+        """Return rows whose column contains text, ignoring case.
+        
+        The posting lists of the query's trigrams are intersected, smallest
+        first, and only the remaining candidates are compared with the text.
+        """
+        text = text.lower()
+        if len(text) < 3:
+            # Too short for a trigram: compare every row
+            return [row for row in self._rows.values() if text in (row.get(column) or '').lower()]
+        
+        postings = self._postings[column]
+        grams = {text[i:i + 3] for i in range(len(text) - 2)}
+        lists = sorted((postings.get(gram, set()) for gram in grams), key=len)
+        candidates = set(lists[0])
+        for ids in lists[1:]:
+            candidates &= ids
+            if not candidates:
+                break
+        return [row for row in self._ordered(candidates) if text in (row.get(column) or '').lower()]
+    
+    def similar(self, column, text, threshold=0.3, limit=5):
+        """Return up to limit (score, row) pairs most similar to text, best first (for typos)."""
+        postings = self._postings[column]
+        candidates = set()
+        for gram in _word_trigrams(text.lower()):
+            candidates |= postings.get(gram, set())
+        
+        scored = []
+        for row in self._ordered(candidates):
+            score = similarity(text, row.get(column) or '')
+            if score >= threshold:
+                scored.append((score, row))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return scored[:limit]
@@ -3,8 +3,10 @@ import os
 from datetime import datetime
 from tabulate import tabulate
 from colorama import Fore, Style
-from .data_manager import read_csv, write_csv, get_patient_name
+from .data_manager import (read_csv, update_row, next_id, active_registrations, active_counts, join_registrations,
+                           schedule_conflicts, append_csv, table_version)
 from .data_structures.linked_list import LinkedList
+from .data_structures.queue import Queue
 from .utils import (clear_screen, show_breadcrumbs, show_error, show_success, show_help, 
                    EnhancedLoadingAnimation, print_banner, get_input_with_prompt, 
                    print_data_table_header, print_section_header)
@@ -91,8 +93,7 @@ def view_doctor_schedules(doctor_id):
     loading.stop()
     
     # Display schedules
-    all_schedules = schedule_list.display()
-    if not all_schedules:
+    if not schedule_list:
         print(Fore.YELLOW + "⚠️  Anda belum memiliki jadwal praktik.")
         print(Fore.WHITE + "💡 Gunakan menu 'Tambah Jadwal' untuk membuat jadwal baru.")
         
@@ -106,12 +107,11 @@ def view_doctor_schedules(doctor_id):
             return
     else:
         # Convert to list of lists for tabulate
+        registered_counts = active_counts()
         table_data = []
-        for i, schedule in enumerate(all_schedules, 1):
+        for i, schedule in enumerate(schedule_list, 1):
             # Count registered patients for this schedule
-            registrations = read_csv("data/pendaftaran.csv")
-            registered_count = len([r for r in registrations 
-                                 if r['jadwal_id'] == schedule['id'] and r['status'] != 'Dibatalkan'])
+            registered_count = registered_counts.get(schedule['id'], 0)
             
             availability = f"{registered_count}/{schedule['kuota']}"
             
@@ -142,13 +142,11 @@ def view_doctor_schedules(doctor_id):
         ]
         print(tabulate(table_data, headers=headers, tablefmt="fancy_grid"))
         
-        print(Fore.CYAN + f"\n📊 Total Jadwal Anda: {Fore.YELLOW}{len(all_schedules)} jadwal")
+        print(Fore.CYAN + f"\n📊 Total Jadwal Anda: {Fore.YELLOW}{len(schedule_list)} jadwal")
         
         # Calculate total capacity and utilization
-        total_capacity = sum(int(s['kuota']) for s in all_schedules)
-        total_registered = sum(len([r for r in read_csv("data/pendaftaran.csv") 
-                                  if r['jadwal_id'] == s['id'] and r['status'] != 'Dibatalkan']) 
-                             for s in all_schedules)
+        total_capacity = sum(int(s['kuota']) for s in schedule_list)
+        total_registered = sum(registered_counts.get(s['id'], 0) for s in schedule_list)
         
         utilization = (total_registered / total_capacity * 100) if total_capacity > 0 else 0
         
@@ -235,21 +233,16 @@ def add_doctor_schedule(doctor_id):
         loading = EnhancedLoadingAnimation("Memeriksa konflik jadwal", "dots")
         loading.start()
         
-        schedules = read_csv("data/jadwal_dokter.csv")
-        for schedule in schedules:
-            if (schedule['dokter_id'] == doctor_id and 
-                schedule['hari'] == selected_day and
-                ((start_time >= schedule['jam_mulai'] and start_time < schedule['jam_selesai']) or
-                 (end_time > schedule['jam_mulai'] and end_time <= schedule['jam_selesai']) or
-                 (start_time <= schedule['jam_mulai'] and end_time >= schedule['jam_selesai']))):
-                loading.stop()
-                show_error(f"Jadwal bertabrakan dengan jadwal existing: {selected_day} {schedule['jam_mulai']}-{schedule['jam_selesai']}")
-                return
+        conflicts = schedule_conflicts(doctor_id, selected_day, start_time, end_time)
+        if conflicts:
+            loading.stop()
+            show_error(f"Jadwal bertabrakan dengan jadwal existing: {selected_day} {conflicts[0]['jam_mulai']}-{conflicts[0]['jam_selesai']}")
+            return
         
         loading.stop()
         
         # Generate new schedule ID
-        new_id = f"J{len(schedules) + 1:03d}"
+        new_id = next_id("data/jadwal_dokter.csv", "J")
         
         # Confirmation
         print(Fore.YELLOW + "\n📋 Konfirmasi Jadwal Baru:")
@@ -281,8 +274,18 @@ def add_doctor_schedule(doctor_id):
             'kuota': quota
         }
         
-        schedules.append(new_schedule)
-        write_csv("data/jadwal_dokter.csv", schedules)
+        # Another session may have added a schedule while we waited for the
+        # confirmation: check again and only insert if the table is unchanged
+        # since that check
+        while True:
+            version = table_version("data/jadwal_dokter.csv")
+            conflicts = schedule_conflicts(doctor_id, selected_day, start_time, end_time)
+            if conflicts:
+                loading.stop()
+                show_error(f"Jadwal bertabrakan dengan jadwal existing: {selected_day} {conflicts[0]['jam_mulai']}-{conflicts[0]['jam_selesai']}")
+                return
+            if append_csv("data/jadwal_dokter.csv", new_schedule, expected_version=version):
+                break
         
         loading.stop()
         
@@ -334,12 +337,10 @@ def edit_doctor_schedule(doctor_id):
     loading.start()
     
     found_schedule = None
-    schedule_index = -1
     
-    for i, schedule in enumerate(schedules):
+    for schedule in schedules:
         if schedule['id'] == schedule_id and schedule['dokter_id'] == doctor_id:
             found_schedule = schedule
-            schedule_index = i
             break
     
     loading.stop()
@@ -358,12 +359,10 @@ def edit_doctor_schedule(doctor_id):
     print(Fore.CYAN + "└─" + "─" * 40 + "┘")
     
     # Check if there are active registrations
-    registrations = read_csv("data/pendaftaran.csv")
-    active_registrations = [r for r in registrations 
-                          if r['jadwal_id'] == schedule_id and r['status'] != 'Dibatalkan']
+    schedule_registrations = active_registrations(schedule_id)
     
-    if active_registrations:
-        print(Fore.YELLOW + f"\n⚠️  Terdapat {len(active_registrations)} pendaftaran aktif pada jadwal ini.")
+    if schedule_registrations:
+        print(Fore.YELLOW + f"\n⚠️  Terdapat {len(schedule_registrations)} pendaftaran aktif pada jadwal ini.")
         print(Fore.WHITE + "💡 Perubahan jadwal mungkin mempengaruhi pasien yang sudah terdaftar.")
         
         proceed = input(Fore.YELLOW + "Lanjutkan edit jadwal? (y/n): " + Fore.WHITE).lower()
@@ -411,6 +410,12 @@ def edit_doctor_schedule(doctor_id):
             show_error("Kuota harus berupa angka positif.")
             return
         
+        # Check for overlapping schedules, other than the one being edited
+        conflicts = schedule_conflicts(doctor_id, selected_day, start_time, end_time, exclude_id=found_schedule['id'])
+        if conflicts:
+            show_error(f"Jadwal bertabrakan dengan jadwal existing: {selected_day} {conflicts[0]['jam_mulai']}-{conflicts[0]['jam_selesai']}")
+            return
+        
         # Confirmation
         print(Fore.YELLOW + "\n📋 Konfirmasi Perubahan:")
         print(Fore.CYAN + "┌─" + "─" * 50 + "┐")
@@ -431,13 +436,18 @@ def edit_doctor_schedule(doctor_id):
         loading = EnhancedLoadingAnimation("Menyimpan perubahan", "bars")
         loading.start()
         
-        # Update schedule
-        schedules[schedule_index]['hari'] = selected_day
-        schedules[schedule_index]['jam_mulai'] = start_time
-        schedules[schedule_index]['jam_selesai'] = end_time
-        schedules[schedule_index]['kuota'] = quota
-        
-        write_csv("data/jadwal_dokter.csv", schedules)
+        # Update schedule; if another session changed the schedules since the
+        # conflict check, check again on the fresh data before retrying
+        changes = {'hari': selected_day, 'jam_mulai': start_time, 'jam_selesai': end_time, 'kuota': quota}
+        while True:
+            version = table_version("data/jadwal_dokter.csv")
+            conflicts = schedule_conflicts(doctor_id, selected_day, start_time, end_time, exclude_id=found_schedule['id'])
+            if conflicts:
+                loading.stop()
+                show_error(f"Jadwal bertabrakan dengan jadwal existing: {selected_day} {conflicts[0]['jam_mulai']}-{conflicts[0]['jam_selesai']}")
+                return
+            if update_row("data/jadwal_dokter.csv", found_schedule['id'], changes, expected_version=version):
+                break
         loading.stop()
         
         show_success("Jadwal berhasil diperbarui.")
@@ -501,8 +511,8 @@ def view_registered_patients(doctor_id):
         
         # Convert to list of lists for tabulate
         table_data = []
-        for i, reg in enumerate(doctor_registrations, 1):
-            patient_name = get_patient_name(reg['pasien_id'])
+        for i, reg in enumerate(join_registrations(doctor_registrations), 1):
+            patient_name = reg['nama_pasien']
             schedule_info = schedule_dict.get(reg['jadwal_id'], "Unknown")
             
             # Enhanced status display with icons
@@ -542,6 +552,22 @@ def view_registered_patients(doctor_id):
         ]
         print(tabulate(table_data, headers=headers, tablefmt="fancy_grid"))
         
+        # Today's waiting room: by session start, then by queue number within a session
+        today = datetime.now().strftime('%Y-%m-%d')
+        waiting_room = Queue()
+        waiting_room.enqueue_many(sorted(
+            join_registrations([r for r in active_registrations if r['status'] == 'Terdaftar' and r['tanggal'] == today]),
+            key=lambda reg: ((reg['jadwal'] or {}).get('jam_mulai', ''),
+                             int(reg['nomor_antrian']) if reg['nomor_antrian'].isdigit() else 0)))
+        
+        if waiting_room:
+            print_section_header("🔔 ANTRIAN HARI INI", "👥")
+            next_patient = waiting_room.peek()
+            print(Fore.WHITE + f"   • Pasien Berikutnya: {Fore.GREEN}{next_patient['nama_pasien']} {Fore.BLUE}(Antrian {next_patient['nomor_antrian']})")
+            print(Fore.WHITE + f"   • Menunggu: {Fore.YELLOW}{len(waiting_room)} pasien")
+            for reg in waiting_room:
+                print(Fore.WHITE + f"     {Fore.BLUE}{reg['nomor_antrian']:>3}. {Fore.YELLOW}{reg['nama_pasien']} {Fore.WHITE}- {schedule_dict.get(reg['jadwal_id'], 'Unknown')}")
+        
         # Group by schedule for better overview
         reg_by_schedule = {}
         for reg in active_registrations:
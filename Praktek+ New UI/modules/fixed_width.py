@@ -0,0 +1,238 @@
+# modules/fixed_width.py - Fixed-width record files with in-place row updates
+import os
+import tempfile
+
+# A fixed-width table file starts with one header line naming the columns and
+# their widths in bytes, e.g. "id:10,pasien_id:10,...\n". Every record after
+# it has the same length: one flag byte (b' ' live, b'-' deleted), each value
+# UTF-8 encoded and padded with spaces to its column width, then b'\n'. Since
+# a record never moves, a row is changed by overwriting its record at a known
+# offset and deleted by overwriting its flag byte. An id -> offset index is
+# built on first use and extended as other sessions append records.
+LIVE = b' '
+DELETED = b'-'
+
+# Minimum widths for known columns; wider values widen the column on the next
+# full rewrite
+DEFAULT_WIDTHS = {
+    'id': 10,
+    'pasien_id': 10,
+    'jadwal_id': 10,
+    'tanggal': 10,
+    'status': 12,
+    'nomor_antrian': 5,
+}
+DEFAULT_WIDTH = 32
+
+# path -> (inode, indexed size, {id: offset})
+_indexes = {}
+
+def data_path(filename):
+    """Return the fixed-width file that stores a table, e.g. data/pendaftaran.dat."""
+    return os.path.splitext(filename)[0] + ".dat"
+
+def _encode(value, width):
+    data = str(value if value is not None else '').encode('utf-8')
+    if len(data) > width or b'\n' in data:
+        raise ValueError("Nilai tidak muat dalam kolom: %r" % value)
+    return data.ljust(width, b' ')
+
+def _read_header(file):
+    """Return (columns, header_length) where columns is a list of (name, width)."""
+    line = file.readline()
+    if not line.endswith(b"\n"):
+        return [], 0
+    columns = []
+    for field in line.decode('utf-8').rstrip("\n").split(","):
+        name, width = field.rsplit(":", 1)
+        columns.append((name, int(width)))
+    return columns, len(line)
+
+def _record_length(columns):
+    return 1 + sum(width for _, width in columns) + 1
+
+def _encode_record(columns, row):
+    return LIVE + b''.join(_encode(row.get(name, ''), width) for name, width in columns) + b"\n"
+
+def _decode_record(columns, record):
+    row = {}
+    position = 1
+    for name, width in columns:
+        row[name] = record[position:position + width].rstrip(b' ').decode('utf-8')
+        position += width
+    return row
+
+def _write_at(fd, data, offset):
+    if hasattr(os, 'pwrite'):
+        os.pwrite(fd, data, offset)
+    else:
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
+
+def _read_at(fd, length, offset):
+    if hasattr(os, 'pread'):
+        return os.pread(fd, length, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, length)
+
+def iter_rows(path):
+    """Yield the live records of a fixed-width file as row dictionaries, one at a time."""
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with file:
+        columns, _ = _read_header(file)
+        length = _record_length(columns)
+        while True:
+            record = file.read(length)
+            if len(record) < length:
+                break  # end of file, or a record torn by a crash mid-append
+            if record[:1] == LIVE:
+                yield _decode_record(columns, record)
+
+def read_table(path):
+    """Return (fieldnames, rows) for the live records of a fixed-width file."""
+    try:
+        with open(path, 'rb') as file:
+            columns, _ = _read_header(file)
+    except FileNotFoundError:
+        return [], []
+    return [name for name, _ in columns], list(iter_rows(path))
+
+def write_table(path, fieldnames, rows):
+    """Atomically replace a fixed-width file, dropping deleted records.
+    
+    Every column is made wide enough for its longest value.
+    """
+    widths = {name: DEFAULT_WIDTHS.get(name, DEFAULT_WIDTH) for name in fieldnames}
+    for row in rows:
+        for name in fieldnames:
+            size = len(str(row.get(name, '') or '').encode('utf-8'))
+            if size > widths[name]:
+                widths[name] = size
+    columns = [(name, widths[name]) for name in fieldnames]
+    header = (",".join("%s:%d" % column for column in columns) + "\n").encode('utf-8')
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(header)
+            file.write(b''.join(_encode_record(columns, row) for row in rows))
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(path):
+            os.chmod(temp_path, os.stat(path).st_mode & 0o777)
+        else:
+            os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        _indexes.pop(os.path.abspath(path), None)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _indexes.pop(os.path.abspath(path), None)
+
+def _index(path, fd, columns, header_length):
+    """Return the id -> offset index of a file, indexing records appended since last time."""
+    key = os.path.abspath(path)
+    stat = os.fstat(fd)
+    entry = _indexes.get(key)
+    if entry and entry[0] == stat.st_ino and entry[1] <= stat.st_size:
+        offsets, start = entry[2], entry[1]
+    else:
+        offsets, start = {}, header_length
+    
+    length = _record_length(columns)
+    id_width = columns[0][1]
+    end = header_length + (stat.st_size - header_length) // length * length
+    if end > start:
+        data = _read_at(fd, end - start, start)
+        for position in range(0, len(data), length):
+            record_id = data[position + 1:position + 1 + id_width].rstrip(b' ').decode('utf-8')
+            if data[position:position + 1] == LIVE:
+                offsets[record_id] = start + position
+            else:
+                offsets.pop(record_id, None)
+    _indexes[key] = (stat.st_ino, max(start, end), offsets)
+    return offsets
+
+def _locate(path, fd, row_id):
+    """Return (columns, offset, record) of the live record with the given id, or None."""
+    with os.fdopen(os.dup(fd), 'rb') as file:
+        columns, header_length = _read_header(file)
+    if not columns or columns[0][0] != 'id':
+        return None
+    offsets = _index(path, fd, columns, header_length)
+    offset = offsets.get(row_id)
+    if offset is None:
+        return None
+    record = _read_at(fd, _record_length(columns), offset)
+    if record[:1] != LIVE:
+        # Deleted by another session since it was indexed
+        offsets.pop(row_id, None)
+        return None
+    return columns, offset, record
+
+def insert_row(path, fieldnames, row, fsync=False):
+    """Append one record, creating the file with the given columns if needed.
+    
+    Raises ValueError if a value does not fit its column.
+    """
+    if not os.path.exists(path):
+        write_table(path, fieldnames, [])
+    with open(path, 'r+b') as file:
+        columns, header_length = _read_header(file)
+        record = _encode_record(columns, row)
+        # Start at the last whole record, overwriting a record torn by a crash
+        size = os.fstat(file.fileno()).st_size
+        offset = header_length + (size - header_length) // len(record) * len(record)
+        _write_at(file.fileno(), record, offset)
+        if fsync:
+            os.fsync(file.fileno())
+
+def update_row(path, row_id, changes, fsync=False):
+    """Overwrite the record of one row in place with a single write.
+    
+    Returns False if there is no such row. Raises ValueError if a new value
+    does not fit its column; nothing is written then.
+    """
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except FileNotFoundError:
+        return False
+    try:
+        found = _locate(path, fd, row_id)
+        if found is None:
+            return False
+        columns, offset, record = found
+        row = _decode_record(columns, record)
+        row.update({k: v for k, v in changes.items() if k in row})
+        _write_at(fd, _encode_record(columns, row), offset)
+        if fsync:
+            os.fsync(fd)
+        if row['id'] != row_id:
+            offsets = _indexes[os.path.abspath(path)][2]
+            offsets[row['id']] = offsets.pop(row_id)
+        return True
+    finally:
+        os.close(fd)
+
+def delete_row(path, row_id, fsync=False):
+    """Mark the record of one row as deleted; returns False if there is no such row."""
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except FileNotFoundError:
+        return False
+    try:
+        found = _locate(path, fd, row_id)
+        if found is None:
+            return False
+        _write_at(fd, DELETED, found[1])
+        if fsync:
+            os.fsync(fd)
+        _indexes[os.path.abspath(path)][2].pop(row_id, None)
+        return True
+    finally:
+        os.close(fd)
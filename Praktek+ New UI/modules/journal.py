@@ -0,0 +1,113 @@
+# modules/journal.py - Write-ahead journal of row-level changes to a CSV table
+import json
+import os
+
+# Every journal starts with a header line naming the base CSV it was written
+# against. If the base file is replaced afterwards (compaction or a full
+# write_csv), the header no longer matches and the journal is ignored, so a
+# crash between replacing the base and removing the journal cannot replay
+# stale changes.
+
+def journal_path(filename):
+    """Return the path of the journal that belongs to a CSV file."""
+    return filename + ".journal"
+
+def base_marker(filename):
+    """Describe the current base CSV file so a journal can be tied to it."""
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def append_entry(filename, entry, fsync=True):
+    """Append one change to the journal of a CSV file, creating the journal if needed."""
+    path = journal_path(filename)
+    created = not os.path.exists(path)
+    with open(path, 'a', encoding='utf-8') as file:
+        if created:
+            file.write(json.dumps({'base': base_marker(filename)}) + "\n")
+        file.write(json.dumps(entry, separators=(',', ':')) + "\n")
+        file.flush()
+        if fsync:
+            os.fsync(file.fileno())
+    return created
+
+def read_entries(filename, offset=0):
+    """Read complete journal entries from offset and return (entries, new_offset, valid).
+    
+    valid is False when the journal was written against a different base file.
+    A torn last line (left by a crash mid-append) is not returned.
+    """
+    path = journal_path(filename)
+    entries = []
+    try:
+        with open(path, 'rb') as file:
+            if offset == 0:
+                header = file.readline()
+                if not header.endswith(b"\n"):
+                    return [], 0, True
+                if json.loads(header).get('base') != base_marker(filename):
+                    return [], 0, False
+                offset = file.tell()
+            else:
+                file.seek(offset)
+            
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                entries.append(json.loads(line))
+                offset += len(line)
+    except FileNotFoundError:
+        return [], 0, True
+    return entries, offset, True
+
+def apply_entries(rows, fieldnames, entries):
+    """Apply journal entries to a list of row dictionaries in place.
+    
+    Replaying is idempotent: an insert whose id already exists replaces that
+    row, and updates or deletes of missing ids are ignored.
+    """
+    if not entries:
+        return
+    
+    positions = {row.get('id'): i for i, row in enumerate(rows)}
+    deleted = False
+    for entry in entries:
+        op = entry.get('op')
+        row_id = entry.get('id')
+        if op == 'insert':
+            row = {name: entry['row'].get(name, '') for name in fieldnames}
+            if row_id in positions and rows[positions[row_id]] is not None:
+                rows[positions[row_id]] = row
+            else:
+                positions[row_id] = len(rows)
+                rows.append(row)
+        elif op == 'update':
+            index = positions.get(row_id)
+            if index is not None and rows[index] is not None:
+                updated = dict(rows[index])
+                updated.update({k: v for k, v in entry['changes'].items() if k in updated})
+                rows[index] = updated
+        elif op == 'delete':
+            index = positions.pop(row_id, None)
+            if index is not None:
+                rows[index] = None
+                deleted = True
+    
+    if deleted:
+        rows[:] = [row for row in rows if row is not None]
+
+def discard(filename):
+    """Remove the journal of a CSV file once its changes live in the base file."""
+    try:
+        os.remove(journal_path(filename))
+    except FileNotFoundError:
+        pass
+
+def journal_size(filename):
+    """Return the size of the journal in bytes (0 if there is none)."""
+    try:
+        return os.path.getsize(journal_path(filename))
+    except FileNotFoundError:
+        return 0
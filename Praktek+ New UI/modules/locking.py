@@ -0,0 +1,116 @@
+# modules/locking.py - Inter-process table locks and version counters
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks become no-ops, versions still count writes
+    fcntl = None
+
+# Each table has a small "<csv>.lock" file next to it. Sessions flock() it
+# shared while reading and exclusive while writing, and the file body holds
+# the table version: a counter bumped when an exclusive lock is released
+# after a write (see mark_changed). A session that remembers the version it read can tell whether
+# anyone wrote the table before it commits its own change.
+#
+# The data files themselves cannot be locked because atomic writes replace
+# them with a new inode. Locks are re-entrant within a process; a shared
+# lock is upgraded in place when the same process asks for an exclusive one.
+
+_held = {}  # lock path -> [fd, exclusive, depth, changed]
+_held_lock = threading.RLock()
+
+def lock_path(filename):
+    """Return the path of the lock file that belongs to a table."""
+    return filename + ".lock"
+
+def _open(path):
+    return os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+def _read_version(fd):
+    os.lseek(fd, 0, os.SEEK_SET)
+    data = os.read(fd, 32).strip()
+    return int(data) if data.isdigit() else 0
+
+def _write_version(fd, version):
+    data = str(version).encode('ascii')
+    os.lseek(fd, 0, os.SEEK_SET)
+    os.write(fd, data)
+    os.ftruncate(fd, len(data))
+
+def _acquire(path, exclusive):
+    """Take (or re-enter) the lock of a lock file; the caller holds _held_lock."""
+    state = _held.get(path)
+    if state is None:
+        fd = _open(path)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        except BaseException:
+            os.close(fd)
+            raise
+        state = _held[path] = [fd, exclusive, 0, False]
+    elif exclusive and not state[1]:
+        if fcntl:
+            fcntl.flock(state[0], fcntl.LOCK_EX)
+        state[1] = True
+    state[2] += 1
+    return state
+
+def _release(path, state):
+    state[2] -= 1
+    if state[2] == 0:
+        del _held[path]
+        try:
+            if state[1] and state[3]:
+                _write_version(state[0], _read_version(state[0]) + 1)
+        finally:
+            os.close(state[0])  # Closing the descriptor releases the flock
+
+@contextmanager
+def table_lock(filename, exclusive=False):
+    """Hold the table lock and yield the table version.
+    
+    Releasing the outermost exclusive lock bumps the version if the table
+    was marked as changed while it was held.
+    """
+    path = os.path.abspath(lock_path(filename))
+    with _held_lock:
+        state = _acquire(path, exclusive)
+        try:
+            yield _read_version(state[0])
+        finally:
+            _release(path, state)
+
+def hold(filename):
+    """Take the table's exclusive lock until a matching release(filename).
+    
+    Unlike table_lock this is not tied to a with block, so a write that
+    waits for a later flush can keep other sessions out until it is on disk.
+    """
+    path = os.path.abspath(lock_path(filename))
+    with _held_lock:
+        _acquire(path, exclusive=True)
+
+def release(filename):
+    """Drop one hold() of the table's lock, bumping the version if it was changed."""
+    path = os.path.abspath(lock_path(filename))
+    with _held_lock:
+        state = _held.get(path)
+        if state is None:
+            raise RuntimeError(f"{filename} is not locked")
+        _release(path, state)
+
+def mark_changed(filename):
+    """Record that the table was written under the exclusive lock held now."""
+    with _held_lock:
+        state = _held.get(os.path.abspath(lock_path(filename)))
+        if state is None or not state[1]:
+            raise RuntimeError(f"{filename} is not locked for writing")
+        state[3] = True
+
+def read_version(filename):
+    """Return the current version of a table."""
+    with table_lock(filename) as version:
+        return version
@@ -0,0 +1,56 @@
+# modules/partitions.py - Month partitions of date-keyed CSV tables
+import os
+import re
+from . import journal
+
+# A partitioned table "data/pendaftaran.csv" lives in the directory
+# "data/pendaftaran/", one CSV file per month of the partition column.
+# Rows whose date cannot be read go to a catch-all partition.
+PARTITION_COLUMN = 'tanggal'
+UNDATED = "tanpa-tanggal"
+
+_MONTH = re.compile(r"^(\d{4}-\d{2})-\d{2}$")
+
+def partition_dir(filename):
+    """Return the directory holding the partitions of a table."""
+    return os.path.splitext(filename)[0]
+
+def partition_key(tanggal):
+    """Return the partition name (YYYY-MM) for a date string."""
+    match = _MONTH.match(tanggal or '')
+    return match.group(1) if match else UNDATED
+
+def partition_file(filename, tanggal):
+    """Return the partition file that holds rows for the given date."""
+    return os.path.join(partition_dir(filename), partition_key(tanggal) + ".csv")
+
+def partition_files(filename, tanggal=None):
+    """Return the existing partition files of a table, oldest month first.
+    
+    When tanggal is given only the partition for that date is returned, so
+    lookups on a single date never open the other months.
+    """
+    if tanggal is not None:
+        path = partition_file(filename, tanggal)
+        return [path] if _exists(path) else []
+    
+    directory = partition_dir(filename)
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    # A month may exist only as a journal until its first compaction
+    journal_suffix = journal.journal_path(".csv")
+    months = {name[:name.index(".csv") + 4] for name in names
+              if name.endswith(".csv") or name.endswith(journal_suffix)}
+    return [os.path.join(directory, name) for name in sorted(months)]
+
+def _exists(path):
+    return os.path.exists(path) or os.path.exists(journal.journal_path(path))
+
+def split_rows(rows):
+    """Group rows by partition name."""
+    groups = {}
+    for row in rows:
+        groups.setdefault(partition_key(row.get(PARTITION_COLUMN)), []).append(row)
+    return groups
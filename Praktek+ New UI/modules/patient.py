@@ -1,10 +1,13 @@
 # modules/patient.py - Enhanced Patient functionality
 import os
 from datetime import datetime, timedelta
+from itertools import islice
 from tabulate import tabulate
 from colorama import Fore, Style
-from .data_manager import read_csv, write_csv, get_doctor_name
-from .data_structures.queue import Queue
+from .data_manager import (read_csv, append_csv, update_row, active_registrations, active_counts,
+                           table_version, next_id, has_archive, get_doctor_name, get_patient_registrations,
+                           join_registrations, search_doctors, schedules_on_day, schedules_overlapping)
+from .data_structures.queue_allocator import QueueNumberAllocator
 from .data_structures.bst import BST
 from .utils import (clear_screen, show_breadcrumbs, show_error, show_success, show_help, 
                    EnhancedLoadingAnimation, print_banner, get_input_with_prompt, 
@@ -47,8 +50,7 @@ def patient_menu(patient_id):
         print(Fore.CYAN + "╚" + "═" * 80 + "╝")
         
         # Show patient info summary
-        registrations = read_csv("data/pendaftaran.csv")
-        patient_regs = [r for r in registrations if r['pasien_id'] == patient_id]
+        patient_regs = get_patient_registrations(patient_id)
         active_regs = [r for r in patient_regs if r['status'] != 'Dibatalkan']
         
         print(Fore.CYAN + "\n📊 Ringkasan Akun Anda:")
@@ -89,7 +91,8 @@ def view_doctor_schedules():
     
     schedules = read_csv("data/jadwal_dokter.csv")
     doctors = read_csv("data/dokter.csv")
-    registrations = read_csv("data/pendaftaran.csv")
+    # Active registrations per schedule, kept in an index instead of counted per listing
+    registered_counts = active_counts()
     
     # Create doctor dictionary for quick lookup
     doctor_dict = {}
@@ -111,8 +114,7 @@ def view_doctor_schedules():
             doctor_info = doctor_dict.get(schedule['dokter_id'], {"nama": "Unknown", "spesialisasi": "Unknown"})
             
             # Calculate availability
-            registered_count = len([r for r in registrations 
-                                  if r['jadwal_id'] == schedule['id'] and r['status'] != 'Dibatalkan'])
+            registered_count = registered_counts.get(schedule['id'], 0)
             quota = int(schedule['kuota'])
             available = quota - registered_count
             
@@ -152,7 +154,7 @@ def view_doctor_schedules():
         
         # Summary statistics
         total_slots = sum(int(s['kuota']) for s in schedules)
-        total_registered = len([r for r in registrations if r['status'] != 'Dibatalkan'])
+        total_registered = sum(registered_counts.values())
         available_slots = total_slots - total_registered
         
         print(Fore.CYAN + f"\n📊 Ringkasan Ketersediaan:")
@@ -193,7 +195,8 @@ def search_doctor_schedules():
     
     schedules = read_csv("data/jadwal_dokter.csv")
     doctors = read_csv("data/dokter.csv")
-    registrations = read_csv("data/pendaftaran.csv")
+    # Active registrations per schedule, kept in an index instead of counted per listing
+    registered_counts = active_counts()
     
     # Create doctor dictionary for quick lookup
     doctor_dict = {}
@@ -204,6 +207,7 @@ def search_doctor_schedules():
         }
     
     results = []
+    fuzzy = False
     loading.stop()
     
     if choice == "1":
@@ -223,10 +227,8 @@ def search_doctor_schedules():
         loading = EnhancedLoadingAnimation("Mencari berdasarkan nama dokter", "dots")
         loading.start()
         
-        for schedule in schedules:
-            doctor_info = doctor_dict.get(schedule['dokter_id'], {"nama": "Unknown", "spesialisasI": "Unknown"})
-            if search_key in doctor_info['nama'].lower():
-                results.append((schedule, doctor_info))
+        matched_doctors, fuzzy = search_doctors('nama', search_key)
+        results = schedules_of_doctors(schedules, matched_doctors, doctor_dict, ranked=fuzzy)
         
         loading.stop()
     
@@ -247,10 +249,8 @@ def search_doctor_schedules():
         loading = EnhancedLoadingAnimation("Mencari berdasarkan spesialisasi", "dots")
         loading.start()
         
-        for schedule in schedules:
-            doctor_info = doctor_dict.get(schedule['dokter_id'], {"nama": "Unknown", "spesialisasi": "Unknown"})
-            if search_key in doctor_info['spesialisasi'].lower():
-                results.append((schedule, doctor_info))
+        matched_doctors, fuzzy = search_doctors('spesialisasi', search_key)
+        results = schedules_of_doctors(schedules, matched_doctors, doctor_dict, ranked=fuzzy)
         
         loading.stop()
     
@@ -276,14 +276,27 @@ def search_doctor_schedules():
                 return
             
             selected_day = days[day_index]
+            time_range = get_input_with_prompt("Rentang jam, mis. 08:00-12:00 (kosongkan untuk sepanjang hari)", "🕐").strip()
             
             loading = EnhancedLoadingAnimation(f"Mencari jadwal hari {selected_day}", "dots")
             loading.start()
             
-            for schedule in schedules:
+            if time_range:
+                # Schedules overlapping the range, from the interval tree of that day
+                start_time, _, end_time = time_range.partition("-")
+                try:
+                    day_schedules = schedules_overlapping(selected_day, start_time.strip(), end_time.strip())
+                except ValueError:
+                    loading.stop()
+                    show_error("Format rentang jam tidak valid. Gunakan HH:MM-HH:MM (contoh: 08:00-12:00)")
+                    return
+            else:
+                # Only that day's schedules are read, already sorted by start time
+                day_schedules = schedules_on_day(selected_day)
+            
+            for schedule in day_schedules:
                 doctor_info = doctor_dict.get(schedule['dokter_id'], {"nama": "Unknown", "spesialisasi": "Unknown"})
-                if schedule['hari'] == selected_day:
-                    results.append((schedule, doctor_info))
+                results.append((schedule, doctor_info))
             
             loading.stop()
                     
@@ -306,12 +319,14 @@ def search_doctor_schedules():
             view_doctor_schedules()
             return
     else:
+        if fuzzy:
+            print(Fore.YELLOW + "💡 Tidak ada yang persis cocok, menampilkan hasil yang paling mirip:")
+        
         # Display results with enhanced formatting
         table_data = []
         for i, (schedule, doctor_info) in enumerate(results, 1):
             # Calculate availability
-            registered_count = len([r for r in registrations 
-                                  if r['jadwal_id'] == schedule['id'] and r['status'] != 'Dibatalkan'])
+            registered_count = registered_counts.get(schedule['id'], 0)
             quota = int(schedule['kuota'])
             available = quota - registered_count
             
@@ -358,6 +373,18 @@ def search_doctor_schedules():
     
     input(Fore.GREEN + "\n⏎ Tekan Enter untuk kembali ke menu...")
 
+def schedules_of_doctors(schedules, doctors, doctor_dict, ranked=False):
+    """Return (schedule, doctor info) pairs for the given doctors.
+    
+    Pairs are in schedule order, or with ranked in the order of the doctors.
+    """
+    rank = {doctor['id']: position for position, doctor in enumerate(doctors)}
+    results = [(schedule, doctor_dict[schedule['dokter_id']]) for schedule in schedules
+               if schedule['dokter_id'] in rank and schedule['dokter_id'] in doctor_dict]
+    if ranked:
+        results.sort(key=lambda pair: rank[pair[0]['dokter_id']])
+    return results
+
 def register_consultation(patient_id):
     """Register for a doctor consultation with enhanced UI and validation."""
     clear_screen()
@@ -373,7 +400,7 @@ def register_consultation(patient_id):
     
     schedules = read_csv("data/jadwal_dokter.csv")
     doctors = read_csv("data/dokter.csv")
-    registrations = read_csv("data/pendaftaran.csv")
+    registered_counts = active_counts()
     
     # Create doctor dictionary
     doctor_dict = {}
@@ -386,8 +413,7 @@ def register_consultation(patient_id):
     # Filter available schedules (not full)
     available_schedules = []
     for schedule in schedules:
-        registered_count = len([r for r in registrations 
-                              if r['jadwal_id'] == schedule['id'] and r['status'] != 'Dibatalkan'])
+        registered_count = registered_counts.get(schedule['id'], 0)
         if registered_count < int(schedule['kuota']):
             available_schedules.append(schedule)
     
@@ -403,8 +429,7 @@ def register_consultation(patient_id):
     table_data = []
     for i, schedule in enumerate(available_schedules, 1):
         doctor_info = doctor_dict.get(schedule['dokter_id'], {"nama": "Unknown", "spesialisasi": "Unknown"})
-        registered_count = len([r for r in registrations 
-                              if r['jadwal_id'] == schedule['id'] and r['status'] != 'Dibatalkan'])
+        registered_count = registered_counts.get(schedule['id'], 0)
         available_spots = int(schedule['kuota']) - registered_count
         
         table_data.append([
@@ -429,6 +454,28 @@ def register_consultation(patient_id):
     # Continue with registration process
     register_consultation_direct(patient_id, schedule_id)
 
+def check_slot(patient_id, schedule_id, date_str, quota):
+    """Check whether a patient can book a schedule on a date.
+    
+    Returns (error message, None) or (None, lowest free queue number). Only
+    that date's active registrations are looked up, through the slot index.
+    """
+    day_registrations = active_registrations(schedule_id, date_str)
+    
+    for reg in day_registrations:
+        if reg['pasien_id'] == patient_id:
+            return "Anda sudah terdaftar pada jadwal ini untuk tanggal tersebut.", None
+    
+    if len(day_registrations) >= quota:
+        return "Maaf, kuota untuk jadwal ini sudah penuh.", None
+    
+    # Lowest queue number not taken on that date
+    queue_number = QueueNumberAllocator.from_registrations(quota, day_registrations).take()
+    if queue_number is None:
+        return "Semua nomor antrian sudah terisi.", None
+    
+    return None, queue_number
+
 def register_consultation_direct(patient_id, schedule_id):
     """Direct registration with schedule ID."""
     loading = EnhancedLoadingAnimation("Memproses pendaftaran", "bars")
@@ -482,51 +529,14 @@ def register_consultation_direct(patient_id, schedule_id):
     date_str = next_occurrence.strftime("%Y-%m-%d")
     formatted_date = next_occurrence.strftime("%A, %d %B %Y")
     
-    # Check existing registration
-    registrations = read_csv("data/pendaftaran.csv")
-    for reg in registrations:
-        if (reg['pasien_id'] == patient_id and reg['jadwal_id'] == schedule_id and 
-            reg['tanggal'] == date_str and reg['status'] != 'Dibatalkan'):
-            loading.stop()
-            show_error("Anda sudah terdaftar pada jadwal ini untuk tanggal tersebut.")
-            return
-    
-    # Check quota
+    # Check existing registration, quota and the next free queue number
     quota = int(selected_schedule['kuota'])
-    registered_count = sum(1 for reg in registrations if 
-                           reg['jadwal_id'] == schedule_id and 
-                           reg['tanggal'] == date_str and 
-                           reg['status'] != 'Dibatalkan')
-    
-    if registered_count >= quota:
+    error, queue_number = check_slot(patient_id, schedule_id, date_str, quota)
+    if error:
         loading.stop()
-        show_error("Maaf, kuota untuk jadwal ini sudah penuh.")
+        show_error(error)
         return
     
-    # Generate queue number
-    queue = Queue()
-    for i in range(1, quota + 1):
-        queue.enqueue(i)
-    
-    # Remove taken queue numbers
-    for reg in registrations:
-        if (reg['jadwal_id'] == schedule_id and reg['tanggal'] == date_str and 
-            reg['status'] != 'Dibatalkan' and reg['nomor_antrian'].isdigit()):
-            queue_num = int(reg['nomor_antrian'])
-            # Remove from queue
-            temp_queue = Queue()
-            while not queue.is_empty():
-                num = queue.dequeue()
-                if num != queue_num:
-                    temp_queue.enqueue(num)
-            queue = temp_queue
-    
-    if queue.is_empty():
-        loading.stop()
-        show_error("Semua nomor antrian sudah terisi.")
-        return
-    
-    queue_number = queue.dequeue()
     loading.stop()
     
     # Show confirmation
@@ -551,20 +561,31 @@ def register_consultation_direct(patient_id, schedule_id):
     loading.start()
     
     # Generate registration ID
-    new_reg_id = f"R{len(registrations) + 1:03d}"
-    
-    # Add registration
-    new_registration = {
-        'id': new_reg_id,
-        'pasien_id': patient_id,
-        'jadwal_id': schedule_id,
-        'tanggal': date_str,
-        'status': 'Terdaftar',
-        'nomor_antrian': str(queue_number)
-    }
+    new_reg_id = next_id("data/pendaftaran.csv", "R")
     
-    registrations.append(new_registration)
-    write_csv("data/pendaftaran.csv", registrations)
+    # Another session may have booked this slot while we waited for the
+    # confirmation: check again and only insert if the table is unchanged
+    # since that check, otherwise repeat it on the fresh data
+    while True:
+        version = table_version("data/pendaftaran.csv")
+        error, queue_number = check_slot(patient_id, schedule_id, date_str, quota)
+        if error:
+            loading.stop()
+            show_error(error)
+            return
+        
+        # Add registration
+        new_registration = {
+            'id': new_reg_id,
+            'pasien_id': patient_id,
+            'jadwal_id': schedule_id,
+            'tanggal': date_str,
+            'status': 'Terdaftar',
+            'nomor_antrian': str(queue_number)
+        }
+        
+        if append_csv("data/pendaftaran.csv", new_registration, expected_version=version):
+            break
     
     loading.stop()
     
@@ -604,10 +625,7 @@ def request_schedule_change(patient_id):
     loading.start()
     
     # Get patient's active registrations
-    registrations = read_csv("data/pendaftaran.csv")
-    patient_registrations = [reg for reg in registrations if 
-                            reg['pasien_id'] == patient_id and 
-                            reg['status'] == 'Terdaftar']
+    patient_registrations = [reg for reg in get_patient_registrations(patient_id) if reg['status'] == 'Terdaftar']
     
     schedules = read_csv("data/jadwal_dokter.csv")
     doctors = read_csv("data/dokter.csv")
@@ -750,10 +768,10 @@ def request_schedule_change(patient_id):
             loading.start()
             
             # Update registration status
-            for i, reg in enumerate(registrations):
+            for i, reg in enumerate(patient_registrations):
                 if reg['id'] == selected_reg['id']:
-                    registrations[i]['status'] = 'Dibatalkan'
-                    write_csv("data/pendaftaran.csv", registrations)
+                    patient_registrations[i]['status'] = 'Dibatalkan'
+                    update_row("data/pendaftaran.csv", reg['id'], {'status': 'Dibatalkan'})
                     loading.stop()
                     
                     print(Fore.GREEN + "\n✅ " + Style.BRIGHT + "PEMBATALAN BERHASIL!")
@@ -772,12 +790,12 @@ def request_schedule_change(patient_id):
             print(Fore.YELLOW + "💡 Pilih jadwal baru untuk mengganti yang lama.")
             
             # Show available schedules excluding current one
+            registered_counts = active_counts()
             available_schedules = []
             for schedule in schedules:
                 if schedule['id'] != selected_reg['jadwal_id']:
                     # Check availability
-                    reg_count = len([r for r in registrations 
-                                   if r['jadwal_id'] == schedule['id'] and r['status'] != 'Dibatalkan'])
+                    reg_count = registered_counts.get(schedule['id'], 0)
                     if reg_count < int(schedule['kuota']):
                         available_schedules.append(schedule)
             
@@ -790,8 +808,7 @@ def request_schedule_change(patient_id):
             table_data = []
             for i, schedule in enumerate(available_schedules, 1):
                 doctor_name_new = doctor_dict.get(schedule['dokter_id'], "Unknown")
-                reg_count = len([r for r in registrations 
-                               if r['jadwal_id'] == schedule['id'] and r['status'] != 'Dibatalkan'])
+                reg_count = registered_counts.get(schedule['id'], 0)
                 available_spots = int(schedule['kuota']) - reg_count
                 
                 table_data.append([
@@ -852,34 +869,26 @@ def request_schedule_change(patient_id):
                 new_date = today + timedelta(days=days_ahead)
                 new_date_str = new_date.strftime("%Y-%m-%d")
                 
-                # Get new queue number
-                new_queue = Queue()
-                for i in range(1, int(new_schedule['kuota']) + 1):
-                    new_queue.enqueue(i)
-                
-                # Remove taken numbers
-                for reg in registrations:
-                    if (reg['jadwal_id'] == new_schedule['id'] and 
-                        reg['tanggal'] == new_date_str and 
-                        reg['status'] != 'Dibatalkan'):
-                        if reg['nomor_antrian'].isdigit():
-                            taken_num = int(reg['nomor_antrian'])
-                            temp_queue = Queue()
-                            while not new_queue.is_empty():
-                                num = new_queue.dequeue()
-                                if num != taken_num:
-                                    temp_queue.enqueue(num)
-                            new_queue = temp_queue
-                
-                new_queue_number = new_queue.dequeue() if not new_queue.is_empty() else 1
-                
-                # Update registration
-                for i, reg in enumerate(registrations):
-                    if reg['id'] == selected_reg['id']:
-                        registrations[i]['jadwal_id'] = new_schedule['id']
-                        registrations[i]['tanggal'] = new_date_str
-                        registrations[i]['nomor_antrian'] = str(new_queue_number)
-                        write_csv("data/pendaftaran.csv", registrations)
+                # Pick the queue number and move the registration; if another
+                # session wrote registrations in between, pick it again
+                while True:
+                    version = table_version("data/pendaftaran.csv")
+                    
+                    # Check the new slot like a new booking (already booked there,
+                    # quota full) and take its lowest free queue number
+                    error, new_queue_number = check_slot(patient_id, new_schedule['id'], new_date_str,
+                                                         int(new_schedule['kuota']))
+                    if error:
+                        loading.stop()
+                        show_error(error)
+                        return
+                    
+                    # Update registration
+                    if update_row("data/pendaftaran.csv", selected_reg['id'], {
+                        'jadwal_id': new_schedule['id'],
+                        'tanggal': new_date_str,
+                        'nomor_antrian': str(new_queue_number)
+                    }, expected_version=version):
                         break
                 
                 loading.stop()
@@ -919,23 +928,17 @@ def view_registration_status(patient_id):
     
     print_data_table_header("📋 STATUS PENDAFTARAN KONSULTASI SAYA 📋")
     
+    # Older finished registrations may have been moved to the archive
+    include_archive = False
+    if has_archive("data/pendaftaran.csv"):
+        include_archive = input(Fore.GREEN + "📦 Tampilkan juga riwayat lama dari arsip? (y/n): " + Fore.WHITE).lower() == 'y'
+    
     loading = EnhancedLoadingAnimation("Memuat riwayat pendaftaran Anda", "dots")
     loading.start()
     
-    registrations = read_csv("data/pendaftaran.csv")
-    patient_registrations = [reg for reg in registrations if reg['pasien_id'] == patient_id]
-    
-    schedules = read_csv("data/jadwal_dokter.csv")
-    doctors = read_csv("data/dokter.csv")
-    
-    # Create lookup dictionaries
-    schedule_dict = {}
-    for schedule in schedules:
-        schedule_dict[schedule['id']] = schedule
-    
-    doctor_dict = {}
-    for doctor in doctors:
-        doctor_dict[doctor['id']] = doctor
+    # Each registration comes with its schedule and doctor attached
+    patient_registrations = list(join_registrations(
+        get_patient_registrations(patient_id, include_archive=include_archive), with_patients=False))
     
     loading.stop()
     
@@ -956,20 +959,33 @@ def view_registration_status(patient_id):
     canceled_regs = [r for r in patient_registrations if r['status'] == 'Dibatalkan']
     completed_regs = [r for r in patient_registrations if r['status'] == 'Selesai']
     
+    # Active appointments ordered by date, for the next one and the upcoming list
+    dated_regs = []
+    for reg in active_regs:
+        try:
+            dated_regs.append((datetime.strptime(reg['tanggal'], '%Y-%m-%d').date(), reg))
+        except ValueError:
+            pass
+    appointments = BST.from_sorted(sorted(dated_regs, key=lambda pair: pair[0]))
+    today = datetime.now().date()
+    next_appointment = appointments.ceiling(today)
+    
     # Enhanced statistics
     print(Fore.CYAN + "📊 Ringkasan Pendaftaran Anda:")
     print(Fore.WHITE + f"   • Total Pendaftaran: {Fore.YELLOW}{len(patient_registrations)}")
     print(Fore.WHITE + f"   • Aktif: {Fore.GREEN}{len(active_regs)}")
     print(Fore.WHITE + f"   • Selesai: {Fore.BLUE}{len(completed_regs)}")
     print(Fore.WHITE + f"   • Dibatalkan: {Fore.RED}{len(canceled_regs)}")
+    if next_appointment:
+        print(Fore.WHITE + f"   • Jadwal Berikutnya: {Fore.CYAN}{next_appointment[0].strftime('%d/%m/%Y')}")
     print()
     
     # Display all registrations with enhanced formatting
     table_data = []
     for i, reg in enumerate(patient_registrations, 1):
-        schedule = schedule_dict.get(reg['jadwal_id'], None)
+        schedule = reg['jadwal']
         if schedule:
-            doctor_info = doctor_dict.get(schedule['dokter_id'], {"nama": "Unknown", "spesialisasi": "Unknown"})
+            doctor_info = reg['dokter'] or {"nama": "Unknown", "spesialisasi": "Unknown"}
             doctor_name = f"{doctor_info['nama']} ({doctor_info['spesialisasi']})"
             schedule_info = f"{schedule['hari']} {schedule['jam_mulai']}-{schedule['jam_selesai']}"
             
@@ -1032,24 +1048,15 @@ def view_registration_status(patient_id):
     if active_regs:
         print_section_header("🔜 JADWAL MENDATANG", "📅")
         
-        upcoming_appointments = []
-        for reg in active_regs:
-            try:
-                appt_date = datetime.strptime(reg['tanggal'], '%Y-%m-%d')
-                if appt_date.date() >= datetime.now().date():
-                    upcoming_appointments.append((reg, appt_date))
-            except:
-                pass
-        
-        # Sort by date
-        upcoming_appointments.sort(key=lambda x: x[1])
+        # The next 3 appointments from today on, already in date order
+        upcoming_appointments = list(islice(appointments.items(lo=today), 3))
         
         if upcoming_appointments:
-            for reg, appt_date in upcoming_appointments[:3]:  # Show next 3 appointments
-                schedule = schedule_dict.get(reg['jadwal_id'])
+            for appt_date, reg in upcoming_appointments:
+                schedule = reg['jadwal']
                 if schedule:
-                    doctor_info = doctor_dict.get(schedule['dokter_id'], {"nama": "Unknown", "spesialisasi": "Unknown"})
-                    days_until = (appt_date.date() - datetime.now().date()).days
+                    doctor_info = reg['dokter'] or {"nama": "Unknown", "spesialisasi": "Unknown"}
+                    days_until = (appt_date - today).days
                     
                     print(Fore.CYAN + "┌─" + "─" * 60 + "┐")
                     print(Fore.CYAN + f"│ 🎫 {Fore.GREEN}{reg['id']}" + " " * (60 - len(f"🎫 {reg['id']}") - 1) + Fore.CYAN + "│")
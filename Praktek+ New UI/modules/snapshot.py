@@ -0,0 +1,66 @@
+# modules/snapshot.py - Snapshots of parsed CSV tables
+import json
+import os
+import tempfile
+
+# A snapshot holds two JSON lines: a small header describing the CSV file it
+# was taken from (including a hash of its content), then the parsed
+# fieldnames and row values. The header is checked before the rows are
+# decoded, so a stale snapshot costs almost nothing. JSON is used instead of
+# pickle so that loading a snapshot can never run code. Snapshots are a cache
+# only: they are never the source of truth, and a missing, stale or
+# unreadable one simply means the CSV is parsed again.
+FORMAT_VERSION = 2
+
+def snapshot_path(filename):
+    """Return the path of the snapshot that belongs to a CSV file."""
+    return filename + ".snap"
+
+def _header(signature, digest):
+    mtime_ns, size = signature[0], signature[1]
+    return {'version': FORMAT_VERSION, 'size': size, 'mtime_ns': mtime_ns, 'digest': digest}
+
+def load(filename, signature, digest):
+    """Return (fieldnames, rows) from the snapshot if it matches the CSV signature and digest, else None."""
+    try:
+        with open(snapshot_path(filename), 'r', encoding='utf-8') as file:
+            if json.loads(file.readline()) != _header(signature, digest):
+                return None
+            fieldnames, values = json.loads(file.readline())
+    except (OSError, ValueError, TypeError):
+        return None
+    return fieldnames, [dict(zip(fieldnames, row)) for row in values]
+
+def save(filename, signature, digest, fieldnames, rows):
+    """Atomically write a snapshot of a parsed CSV file; failures are ignored.
+    
+    Rows with more or fewer values than fieldnames are not stored by name, so
+    a table that has any is not snapshotted.
+    """
+    if any(len(row) != len(fieldnames) for row in rows):
+        return
+    path = snapshot_path(filename)
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, temp_path = tempfile.mkstemp(prefix=".snap-", dir=directory)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(_header(signature, digest)) + "\n")
+            json.dump([fieldnames, [[row[name] for name in fieldnames] for row in rows]], file,
+                      ensure_ascii=False, separators=(',', ':'))
+            file.write("\n")
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+def discard(filename):
+    """Remove the snapshot of a CSV file, if any."""
+    try:
+        os.remove(snapshot_path(filename))
+    except FileNotFoundError:
+        pass
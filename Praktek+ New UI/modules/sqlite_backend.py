@@ -0,0 +1,235 @@
+# modules/sqlite_backend.py - SQLite storage backend for the clinic tables
+import csv
+import os
+import sqlite3
+import threading
+from . import config
+
+# Columns of every table, in the same order as the CSV headers
+TABLES = {
+    'admin': ['id', 'nama', 'username', 'password'],
+    'dokter': ['id', 'nama', 'spesialisasi', 'username', 'password'],
+    'pasien': ['id', 'nama', 'username', 'password', 'kontak'],
+    'jadwal_dokter': ['id', 'dokter_id', 'hari', 'jam_mulai', 'jam_selesai', 'kuota'],
+    'pendaftaran': ['id', 'pasien_id', 'jadwal_id', 'tanggal', 'status', 'nomor_antrian'],
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_pendaftaran_jadwal ON pendaftaran (jadwal_id, tanggal, status)",
+    "CREATE INDEX IF NOT EXISTS idx_pendaftaran_pasien ON pendaftaran (pasien_id)",
+    "CREATE INDEX IF NOT EXISTS idx_admin_username ON admin (username)",
+    "CREATE INDEX IF NOT EXISTS idx_dokter_username ON dokter (username)",
+    "CREATE INDEX IF NOT EXISTS idx_pasien_username ON pasien (username)",
+]
+
+_connection = None
+_connection_lock = threading.RLock()
+
+# Change counters: writes made through this process's connection bump the
+# table's counter, and _generation counts the connections opened. Together
+# with PRAGMA data_version (which moves when another connection commits)
+# they tell whether a table may have changed since it was last read.
+_changes = {}
+_generation = 0
+
+def table_for(filename):
+    """Return the table name backing a CSV path, or None if it is not a clinic table."""
+    name = os.path.splitext(os.path.basename(filename))[0]
+    return name if name in TABLES else None
+
+def get_connection():
+    """Open (once) the shared database connection and make sure the schema exists."""
+    global _connection, _generation
+    with _connection_lock:
+        if _connection is None:
+            directory = os.path.dirname(config.SQLITE_PATH)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            
+            connection = sqlite3.connect(config.SQLITE_PATH, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for table, columns in TABLES.items():
+                column_defs = ", ".join(
+                    f"{column} TEXT PRIMARY KEY" if column == 'id' else f"{column} TEXT NOT NULL DEFAULT ''"
+                    for column in columns
+                )
+                connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({column_defs})")
+            for statement in INDEXES:
+                connection.execute(statement)
+            connection.commit()
+            _connection = connection
+            _generation += 1
+        return _connection
+
+def close_connection():
+    """Close the shared database connection if it is open."""
+    global _connection
+    with _connection_lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+
+def table_signature(table):
+    """Return a value that changes whenever the table may have changed, from any session."""
+    with _connection_lock:
+        data_version = get_connection().execute("PRAGMA data_version").fetchone()[0]
+        return (_generation, data_version, _changes.get(table, 0))
+
+def _changed(table):
+    _changes[table] = _changes.get(table, 0) + 1
+
+def _values(table, row):
+    return [str(row.get(column, '') or '') for column in TABLES[table]]
+
+def read_table(table):
+    """Return every row of a table as a list of dictionaries, in insertion order."""
+    columns = TABLES[table]
+    with _connection_lock:
+        cursor = get_connection().execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid")
+        return [dict(zip(columns, record)) for record in cursor.fetchall()]
+
+def iter_table(table, batch_size=500):
+    """Yield the rows of a table one at a time, fetching them in small batches."""
+    columns = TABLES[table]
+    last_rowid = 0
+    while True:
+        with _connection_lock:
+            records = get_connection().execute(
+                f"SELECT rowid, {', '.join(columns)} FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last_rowid, batch_size)
+            ).fetchall()
+        if not records:
+            return
+        for record in records:
+            yield dict(zip(columns, record[1:]))
+        last_rowid = records[-1][0]
+
+def write_table(table, rows):
+    """Replace the whole content of a table in a single transaction."""
+    columns = TABLES[table]
+    placeholders = ", ".join("?" for _ in columns)
+    with _connection_lock:
+        connection = get_connection()
+        with connection:
+            connection.execute(f"DELETE FROM {table}")
+            connection.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                [_values(table, row) for row in rows]
+            )
+        _changed(table)
+
+def insert_row(table, row):
+    """Insert a single row into a table."""
+    columns = TABLES[table]
+    placeholders = ", ".join("?" for _ in columns)
+    with _connection_lock:
+        connection = get_connection()
+        with connection:
+            connection.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                _values(table, row)
+            )
+        _changed(table)
+
+def update_row(table, row_id, changes):
+    """Update some columns of the row with the given id."""
+    columns = [column for column in changes if column in TABLES[table] and column != 'id']
+    if not columns:
+        return
+    assignments = ", ".join(f"{column} = ?" for column in columns)
+    with _connection_lock:
+        connection = get_connection()
+        with connection:
+            connection.execute(
+                f"UPDATE {table} SET {assignments} WHERE id = ?",
+                [str(changes[column]) for column in columns] + [row_id]
+            )
+        _changed(table)
+
+def delete_row(table, row_id):
+    """Delete the row with the given id."""
+    with _connection_lock:
+        connection = get_connection()
+        with connection:
+            connection.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+        _changed(table)
+
+def _where_clause(table, where, exclude):
+    clauses = []
+    params = []
+    for column, value in where.items():
+        if column not in TABLES[table]:
+            raise KeyError(column)
+        clauses.append(f"{column} = ?")
+        params.append(value)
+    for column, value in (exclude or {}).items():
+        if column not in TABLES[table]:
+            raise KeyError(column)
+        clauses.append(f"{column} != ?")
+        params.append(value)
+    sql = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    return sql, params
+
+def select_rows(table, where, exclude=None):
+    """Return rows whose columns equal the given values, using the table indexes."""
+    columns = TABLES[table]
+    sql, params = _where_clause(table, where, exclude)
+    with _connection_lock:
+        cursor = get_connection().execute(
+            f"SELECT {', '.join(columns)} FROM {table}{sql} ORDER BY rowid", params
+        )
+        return [dict(zip(columns, record)) for record in cursor.fetchall()]
+
+def select_by_username(table, username, ignore_case=False):
+    """Return the rows of an account table with this username, optionally ignoring case."""
+    columns = TABLES[table]
+    collate = " COLLATE NOCASE" if ignore_case else ""
+    with _connection_lock:
+        cursor = get_connection().execute(
+            f"SELECT {', '.join(columns)} FROM {table} WHERE username = ?{collate} ORDER BY rowid", (username,)
+        )
+        return [dict(zip(columns, record)) for record in cursor.fetchall()]
+
+def count_rows(table, where, exclude=None):
+    """Count rows whose columns equal the given values, using the table indexes."""
+    sql, params = _where_clause(table, where, exclude)
+    with _connection_lock:
+        cursor = get_connection().execute(f"SELECT COUNT(*) FROM {table}{sql}", params)
+        return cursor.fetchone()[0]
+
+def count_by(table, column, where, exclude=None):
+    """Count matching rows grouped by the value of one column."""
+    if column not in TABLES[table]:
+        raise KeyError(column)
+    sql, params = _where_clause(table, where, exclude)
+    with _connection_lock:
+        cursor = get_connection().execute(
+            f"SELECT {column}, COUNT(*) FROM {table}{sql} GROUP BY {column}", params
+        )
+        return dict(cursor.fetchall())
+
+def migrate_csv_to_sqlite(data_dir="data", only_empty=False):
+    """Copy every clinic CSV file into the database and return the rows copied per table.
+    
+    With only_empty=True tables that already hold data are left untouched, which
+    makes the migration safe to run on every start-up.
+    """
+    migrated = {}
+    for table in TABLES:
+        path = os.path.join(data_dir, f"{table}.csv")
+        if not os.path.exists(path):
+            continue
+        if only_empty and count_rows(table, {}) > 0:
+            continue
+        
+        with open(path, 'r', newline='', encoding='utf-8-sig') as file:
+            rows = list(csv.DictReader(file))
+        write_table(table, rows)
+        migrated[table] = len(rows)
+    return migrated
+
+if __name__ == "__main__":
+    # One-shot migration: python -m modules.sqlite_backend
+    for table, count in migrate_csv_to_sqlite().items():
+        print(f"{table}: {count} baris dipindahkan ke {config.SQLITE_PATH}")
@@ -0,0 +1,56 @@
+# tests/conftest.py - Shared fixtures for the data layer tests
+import os
+import subprocess
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from modules import config, data_manager
+
+def _reset_state():
+    data_manager.flush_pending_writes()
+    data_manager.invalidate_cache()
+    data_manager._row_indexes.clear()
+    data_manager._sequence_blocks.clear()
+    data_manager._journaled_files.clear()
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Run the test in an empty working directory with its own data/ folder.
+    
+    The data layer uses relative "data/..." paths and per-process caches,
+    so every test starts from a fresh directory and fresh module state.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "STORAGE_BACKEND", "csv")
+    monkeypatch.setattr(config, "JOURNAL_TABLES", ())
+    monkeypatch.setattr(config, "JOURNAL_COMPACT_INTERVAL", 0)
+    monkeypatch.setattr(config, "PARTITION_TABLES", ())
+    monkeypatch.setattr(config, "FIXED_WIDTH_TABLES", ())
+    monkeypatch.setattr(config, "SNAPSHOT_MIN_BYTES", 0)
+    monkeypatch.setattr(config, "GROUP_COMMIT_WINDOW", 0)
+    _reset_state()
+    os.mkdir("data")
+    yield tmp_path / "data"
+    _reset_state()
+
+def registration(row_id, **values):
+    """Return a registration row with sensible defaults."""
+    row = {'id': row_id, 'pasien_id': 'P001', 'jadwal_id': 'J001',
+           'tanggal': '2026-10-19', 'status': 'Terdaftar', 'nomor_antrian': '1'}
+    row.update(values)
+    return row
+
+def run_in_other_process(code, *args, **settings):
+    """Run Python code in a separate session on the same data directory.
+    
+    The session gets the default configuration plus the given PRAKTEK_*
+    settings, e.g. PRAKTEK_JOURNAL_TABLES="pendaftaran".
+    """
+    env = {name: value for name, value in os.environ.items() if not name.startswith("PRAKTEK_")}
+    env.update(settings)
+    env['PYTHONPATH'] = APP_DIR
+    return subprocess.Popen([sys.executable, "-c", code, *args], env=env)
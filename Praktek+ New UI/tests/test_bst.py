@@ -0,0 +1,92 @@
+# tests/test_bst.py - The AVL tree in data_structures.bst against a sorted list
+import math
+import random
+
+import pytest
+
+from modules.data_structures.bst import BST
+
+def check_avl(node, low=None, high=None):
+    """Return the height of a subtree after checking its order, heights and balance."""
+    if node is None:
+        return 0
+    assert low is None or not node.key < low
+    assert high is None or not high < node.key
+    left = check_avl(node.left, low, node.key)
+    right = check_avl(node.right, node.key, high)
+    assert abs(left - right) <= 1
+    assert node.height == max(left, right) + 1
+    return node.height
+
+def test_random_operations_match_a_sorted_list():
+    random.seed(7)
+    tree = BST()
+    oracle = []  # (key, value) pairs
+    for step in range(3000):
+        key = random.randint(0, 200)
+        if random.random() < 0.6 or not oracle:
+            tree.insert(key, step)
+            oracle.append((key, step))
+        else:
+            removed = tree.delete(key)
+            matches = [pair for pair in oracle if pair[0] == key]
+            assert removed == bool(matches)
+            if removed:
+                # Any one entry with the key may go; find out which from the tree
+                remaining = sorted(tree.items(key, key))
+                assert len(remaining) == len(matches) - 1
+                assert all(pair in matches for pair in remaining)
+                oracle = [pair for pair in oracle if pair[0] != key] + remaining
+        
+        if step % 100 == 0:
+            check_avl(tree.root)
+            assert len(tree) == len(oracle)
+            assert sorted(tree.items()) == sorted(oracle)
+            assert [key for key, _ in tree.items()] == sorted(key for key, _ in oracle)
+    
+    check_avl(tree.root)
+    keys = sorted(key for key, _ in oracle)
+    for probe in range(-5, 210):
+        at_least = [key for key in keys if key >= probe]
+        ceiling = tree.ceiling(probe)
+        assert (ceiling[0] if ceiling else None) == (at_least[0] if at_least else None)
+        assert (probe in tree) == (probe in keys)
+        value = tree.search(probe)
+        assert (value is None) == (probe not in keys)
+        if value is not None:
+            assert (probe, value) in oracle
+    
+    for _ in range(200):
+        low, high = sorted(random.sample(range(-5, 210), 2))
+        assert sorted(tree.items(low, high)) == sorted(pair for pair in oracle if low <= pair[0] <= high)
+
+def test_equal_keys_are_kept_in_insertion_order():
+    tree = BST()
+    for value in range(10):
+        tree.insert("2026-10-19", value)
+    assert [value for _, value in tree.items()] == list(range(10))
+
+def test_sorted_insertion_stays_shallow():
+    tree = BST()
+    count = 20000
+    for number in range(count):
+        tree.insert(f"R{number:05d}", number)
+    assert check_avl(tree.root) <= 1.45 * math.log2(count + 2)
+    assert tree.search("R12345") == 12345
+
+def test_from_sorted_builds_a_balanced_tree():
+    pairs = [(key, str(key)) for key in range(0, 1000, 3)]
+    tree = BST.from_sorted(pairs)
+    check_avl(tree.root)
+    assert len(tree) == len(pairs)
+    assert list(tree.items()) == pairs
+    assert tree.ceiling(4) == (6, "6")
+    
+    tree.insert(5, "5")
+    assert tree.delete(6)
+    check_avl(tree.root)
+    assert tree.ceiling(4) == (5, "5")
+
+def test_from_sorted_rejects_unsorted_input():
+    with pytest.raises(ValueError):
+        BST.from_sorted([(2, "b"), (1, "a")])
@@ -0,0 +1,74 @@
+# tests/test_data_manager.py - Version checks and concurrent writes on CSV tables
+from conftest import registration, run_in_other_process
+from modules import data_manager
+
+TABLE = "data/pendaftaran.csv"
+
+def test_update_with_current_version_is_applied(data_dir):
+    data_manager.append_csv(TABLE, registration('R001'))
+    version = data_manager.table_version(TABLE)
+    
+    assert data_manager.update_row(TABLE, 'R001', {'status': 'Dibatalkan'}, expected_version=version)
+    assert data_manager.find_rows(TABLE, id='R001')[0]['status'] == 'Dibatalkan'
+    assert data_manager.table_version(TABLE) != version
+
+def test_stale_version_is_rejected(data_dir):
+    data_manager.append_csv(TABLE, registration('R001'))
+    version = data_manager.table_version(TABLE)
+    data_manager.update_row(TABLE, 'R001', {'nomor_antrian': '2'})
+    
+    assert not data_manager.update_row(TABLE, 'R001', {'status': 'Dibatalkan'}, expected_version=version)
+    assert not data_manager.append_csv(TABLE, registration('R002'), expected_version=version)
+    assert not data_manager.delete_row(TABLE, 'R001', expected_version=version)
+    assert not data_manager.write_csv(TABLE, [registration('R003')], expected_version=version)
+    assert [dict(row) for row in data_manager.read_csv(TABLE)] == [registration('R001', nomor_antrian='2')]
+
+def test_write_by_another_process_is_detected(data_dir):
+    data_manager.append_csv(TABLE, registration('R001'))
+    version = data_manager.table_version(TABLE)
+    
+    writer = run_in_other_process(
+        "from modules import data_manager\n"
+        "data_manager.update_row('data/pendaftaran.csv', 'R001', {'status': 'Selesai'})\n")
+    assert writer.wait(timeout=60) == 0
+    
+    assert not data_manager.update_row(TABLE, 'R001', {'status': 'Dibatalkan'}, expected_version=version)
+    assert data_manager.find_rows(TABLE, id='R001')[0]['status'] == 'Selesai'
+
+WORKER = """
+import sys
+from modules import data_manager
+for _ in range(int(sys.argv[1])):
+    row_id = data_manager.next_id('data/pendaftaran.csv', 'R')
+    data_manager.append_csv('data/pendaftaran.csv', {
+        'id': row_id, 'pasien_id': sys.argv[2], 'jadwal_id': 'J001',
+        'tanggal': '2026-10-19', 'status': 'Terdaftar', 'nomor_antrian': '1'})
+"""
+
+def test_concurrent_next_id_and_append_keep_every_row(data_dir):
+    data_manager.append_csv(TABLE, registration('R001'))
+    
+    workers = [run_in_other_process(WORKER, "40", f"P{100 + i}") for i in range(4)]
+    for worker in workers:
+        assert worker.wait(timeout=120) == 0
+    
+    data_manager.invalidate_cache()
+    rows = data_manager.read_csv(TABLE)
+    ids = [row['id'] for row in rows]
+    assert len(ids) == 1 + 4 * 40
+    assert len(set(ids)) == len(ids)
+    assert all(row['nomor_antrian'] == '1' for row in rows)  # no torn or merged lines
+    for i in range(4):
+        assert data_manager.count_rows(TABLE, pasien_id=f"P{100 + i}") == 40
+    assert data_manager.next_id(TABLE, 'R') not in ids
+
+def test_next_id_continues_after_existing_ids_and_deletions(data_dir):
+    data_manager.write_csv(TABLE, [registration('R001'), registration('R007')])
+    
+    first = data_manager.next_id(TABLE, 'R')
+    assert first == 'R008'
+    data_manager.append_csv(TABLE, registration(first))
+    data_manager.delete_row(TABLE, first)
+    
+    data_manager._sequence_blocks.clear()  # as if a new session started
+    assert data_manager.next_id(TABLE, 'R') not in ('R001', 'R007', 'R008')
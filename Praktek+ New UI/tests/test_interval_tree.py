@@ -0,0 +1,70 @@
+# tests/test_interval_tree.py - Overlap queries of the interval tree against a plain list
+import random
+
+from modules.data_structures.interval_tree import IntervalTree
+from modules.data_structures.schedule_index import ScheduleIndex
+
+def check_tree(node):
+    """Return (height, max_end) of a subtree after checking its invariants."""
+    if node is None:
+        return 0, None
+    left_height, left_end = check_tree(node.left)
+    right_height, right_end = check_tree(node.right)
+    if node.left:
+        assert (node.left.start, node.left.end, node.left.key) < (node.start, node.end, node.key)
+    if node.right:
+        assert (node.right.start, node.right.end, node.right.key) > (node.start, node.end, node.key)
+    assert abs(left_height - right_height) <= 1
+    assert node.height == max(left_height, right_height) + 1
+    assert node.max_end == max(end for end in (node.end, left_end, right_end) if end is not None)
+    return node.height, node.max_end
+
+def naive_overlapping(intervals, start, end):
+    return [key for s, e, key in sorted(intervals) if s < end and start < e]
+
+def test_random_operations_match_a_plain_list():
+    random.seed(11)
+    tree = IntervalTree()
+    intervals = []
+    for step in range(2000):
+        if random.random() < 0.65 or not intervals:
+            start = random.randint(0, 24 * 60 - 1)
+            end = start + random.randint(1, 300)
+            key = f"J{step:04d}"
+            tree.insert(start, end, key)
+            intervals.append((start, end, key))
+        else:
+            interval = random.choice(intervals)
+            assert tree.remove(*interval)
+            intervals.remove(interval)
+            assert not tree.remove(*interval)
+        
+        if step % 50 == 0:
+            check_tree(tree.root)
+            assert len(tree) == len(intervals)
+            for _ in range(20):
+                start = random.randint(0, 24 * 60)
+                end = start + random.randint(1, 240)
+                assert tree.overlapping(start, end) == naive_overlapping(intervals, start, end)
+
+def test_touching_intervals_do_not_overlap():
+    tree = IntervalTree()
+    tree.insert(8 * 60, 12 * 60, "J001")
+    assert tree.overlapping(12 * 60, 13 * 60) == []
+    assert tree.overlapping(7 * 60, 8 * 60) == []
+    assert tree.overlapping(11 * 60 + 59, 13 * 60) == ["J001"]
+
+def test_schedule_index_conflicts_follow_changes():
+    rows = [
+        {'id': 'J001', 'dokter_id': 'D001', 'hari': 'Senin', 'jam_mulai': '08:00', 'jam_selesai': '12:00'},
+        {'id': 'J002', 'dokter_id': 'D001', 'hari': 'Senin', 'jam_mulai': '13:00', 'jam_selesai': '15:00'},
+        {'id': 'J003', 'dokter_id': 'D002', 'hari': 'Senin', 'jam_mulai': '09:00', 'jam_selesai': '10:00'},
+    ]
+    index = ScheduleIndex(rows)
+    assert [row['id'] for row in index.conflicts('D001', 'Senin', 11 * 60, 14 * 60)] == ['J001', 'J002']
+    assert [row['id'] for row in index.overlapping('Senin', 9 * 60, 9 * 60 + 30)] == ['J001', 'J003']
+    
+    index.apply({'op': 'update', 'id': 'J001', 'changes': {'hari': 'Selasa'}})
+    index.apply({'op': 'delete', 'id': 'J002'})
+    assert index.conflicts('D001', 'Senin', 11 * 60, 14 * 60) == []
+    assert [row['id'] for row in index.conflicts('D001', 'Selasa', 11 * 60, 14 * 60)] == ['J001']
@@ -0,0 +1,90 @@
+# tests/test_journal.py - Journal replay and compaction for journaled tables
+import shutil
+
+import pytest
+
+from conftest import registration, run_in_other_process
+from modules import config, data_manager, journal
+
+TABLE = "data/pendaftaran.csv"
+
+@pytest.fixture
+def journaled(data_dir, monkeypatch):
+    """A pendaftaran table with R001-R003 in its base file and journaling on."""
+    monkeypatch.setattr(config, "JOURNAL_TABLES", ("pendaftaran",))
+    monkeypatch.setattr(config, "JOURNAL_FSYNC", False)
+    data_manager.write_csv(TABLE, [registration('R001'), registration('R002'), registration('R003')])
+    return data_dir
+
+def make_changes():
+    data_manager.append_csv(TABLE, registration('R004', jadwal_id='J002'))
+    data_manager.update_row(TABLE, 'R001', {'status': 'Dibatalkan'})
+    data_manager.delete_row(TABLE, 'R002')
+
+EXPECTED = [
+    registration('R001', status='Dibatalkan'),
+    registration('R003'),
+    registration('R004', jadwal_id='J002'),
+]
+
+def rows():
+    return [dict(row) for row in data_manager.read_csv(TABLE)]
+
+def test_changes_are_journaled_without_rewriting_the_base_file(journaled):
+    with open(TABLE, 'rb') as file:
+        base = file.read()
+    
+    make_changes()
+    
+    with open(TABLE, 'rb') as file:
+        assert file.read() == base
+    assert journal.journal_size(TABLE) > 0
+    assert rows() == EXPECTED
+
+def test_journal_is_replayed_from_disk(journaled):
+    make_changes()
+    data_manager.invalidate_cache()
+    
+    assert rows() == EXPECTED
+
+def test_changes_from_another_process_are_replayed_incrementally(journaled):
+    assert len(rows()) == 3  # cached before the other session writes
+    
+    writer = run_in_other_process(
+        "from modules import data_manager\n"
+        "data_manager.update_row('data/pendaftaran.csv', 'R003', {'nomor_antrian': '9'})\n"
+        "data_manager._journaled_files.clear()  # exit without compacting\n",
+        PRAKTEK_JOURNAL_TABLES="pendaftaran", PRAKTEK_JOURNAL_COMPACT_INTERVAL="0")
+    assert writer.wait(timeout=60) == 0
+    
+    assert journal.journal_size(TABLE) > 0
+    assert data_manager.find_rows(TABLE, id='R003')[0]['nomor_antrian'] == '9'
+
+def test_torn_last_entry_is_ignored(journaled):
+    make_changes()
+    with open(journal.journal_path(TABLE), 'a', encoding='utf-8') as file:
+        file.write('{"op":"delete","id":"R00')  # crash in the middle of an append
+    data_manager.invalidate_cache()
+    
+    assert rows() == EXPECTED
+
+def test_compaction_folds_the_journal_into_the_base_file(journaled):
+    make_changes()
+    data_manager.compact_journals()
+    
+    assert journal.journal_size(TABLE) == 0
+    assert data_manager._read_csv_file(TABLE)[1] == EXPECTED
+    data_manager.invalidate_cache()
+    assert rows() == EXPECTED
+
+def test_journal_left_over_from_compaction_is_not_replayed(journaled):
+    make_changes()
+    shutil.copy(journal.journal_path(TABLE), "stale.journal")
+    data_manager.compact_journal(TABLE)
+    
+    # A crash after the base file was replaced but before the journal was removed
+    shutil.copy("stale.journal", journal.journal_path(TABLE))
+    data_manager.invalidate_cache()
+    
+    assert rows() == EXPECTED
+    assert journal.journal_size(TABLE) == 0